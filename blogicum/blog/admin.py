@@ -14,7 +14,8 @@ class PostAdmin(admin.ModelAdmin):
         'created_at',
         'author_id',
         'category_id',
-        'location_id'
+        'location_id',
+        'comment_count'
     )
     search_fields = (
         'title',
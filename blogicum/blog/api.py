@@ -0,0 +1,244 @@
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.paginator import InvalidPage
+from django.db.models import Case, F, When
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.views import View
+
+from .caching import (
+    POSTS_SCOPE,
+    author_scope,
+    category_scope,
+    get_cached_object_or_404,
+    memoize_per_request,
+    post_scope
+)
+from .mixin import ConditionalGetMixin, ReplicaReadMixin
+from .models import Category, Comment, Post
+from .paginators import CursorPaginator
+from blogicum.constants import (
+    API_PAGE_SIZE,
+    COMMENTS_PER_PAGE,
+    LOOKUP_CACHE_TIMEOUT
+)
+
+
+User = get_user_model()
+
+# Поля ответа: имя в JSON -> поле для values() или выражение.
+POST_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'updated_at': 'updated_at',
+    'author': 'author__username',
+    'category': 'category__slug',
+    'location': Case(
+        When(location__is_published=True, then=F('location__name'))
+    ),
+    'comment_count': 'comment_count',
+    'image': 'image',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'post': 'post_id',
+    'author': 'author__username',
+    'text': 'text',
+    'created_at': 'created_at',
+}
+CATEGORY_FIELDS = {
+    'id': 'id',
+    'slug': 'slug',
+    'title': 'title',
+    'description': 'description',
+}
+
+
+def image_url(name):
+    return default_storage.url(name) if name else None
+
+
+class ApiError(Exception):
+    pass
+
+
+class ApiMixin(ConditionalGetMixin, ReplicaReadMixin):
+    """Отдаёт записи в JSON прямо из values(), без создания моделей.
+
+    ?fields=title,author оставляет в ответе только перечисленные поля,
+    и только они выбираются из базы.
+    """
+
+    http_method_names = ('get', 'head', 'options')
+    fields = {}
+    converters = {}
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        except Http404:
+            return JsonResponse({'error': 'Не найдено'}, status=404)
+
+    @memoize_per_request
+    def get_field_names(self):
+        names = tuple(dict.fromkeys(
+            name.strip()
+            for name in self.request.GET.get('fields', '').split(',')
+            if name.strip()
+        ))
+        if not names:
+            return tuple(self.fields)
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError(
+                'Неизвестные поля: ' + ', '.join(unknown)
+                + '. Доступны: ' + ', '.join(self.fields)
+            )
+        return names
+
+    def get_values(self, queryset, extra=()):
+        """Возвращает values() с выбранными полями и словарь переименования
+        ключей строки в имена полей ответа.
+        """
+        lookups = list(extra)
+        expressions = {}
+        keys = {}
+        for name in self.get_field_names():
+            spec = self.fields[name]
+            if isinstance(spec, str):
+                lookups.append(spec)
+                keys[spec] = name
+            else:
+                expressions[f'api_{name}'] = spec
+                keys[f'api_{name}'] = name
+        return queryset.values(*dict.fromkeys(lookups), **expressions), keys
+
+    def serialize(self, row, keys):
+        data = {}
+        for key, name in keys.items():
+            value = row[key]
+            if name in self.converters:
+                value = self.converters[name](value)
+            data[name] = value
+        return data
+
+
+class ApiListMixin(ApiMixin):
+    model = None
+    queryset = None
+    ordering = ('-pub_date', '-id')
+    per_page = API_PAGE_SIZE
+
+    def get_queryset(self):
+        if self.queryset is not None:
+            return self.queryset.all()
+        return self.model._default_manager.all()
+
+    def get(self, request, *args, **kwargs):
+        sort_fields = [name.lstrip('-') for name in self.ordering]
+        queryset, keys = self.get_values(self.get_queryset(), sort_fields)
+        paginator = CursorPaginator(queryset, self.per_page, self.ordering)
+        try:
+            page = paginator.page(request.GET.get('cursor'))
+        except InvalidPage as error:
+            raise ApiError(str(error))
+        return JsonResponse({
+            'results': [self.serialize(row, keys) for row in page],
+            'next': self.get_page_url(page.next_cursor),
+            'previous': self.get_page_url(page.previous_cursor),
+        })
+
+    def get_page_url(self, cursor):
+        if cursor is None:
+            return None
+        query = self.request.GET.copy()
+        query['cursor'] = cursor
+        return f'{self.request.path}?{query.urlencode()}'
+
+
+class PostListApiView(ApiListMixin, View):
+    fields = POST_FIELDS
+    converters = {'image': image_url}
+
+    def get_page_cache_scopes(self):
+        return (POSTS_SCOPE,)
+
+    def get_queryset(self):
+        return Post.published_posts.all()
+
+
+class CategoryPostListApiView(PostListApiView):
+    def get_page_cache_scopes(self):
+        return (category_scope(self.get_category().pk),)
+
+    @memoize_per_request
+    def get_category(self):
+        return get_cached_object_or_404(
+            Category,
+            'slug',
+            self.kwargs['category_slug'],
+            LOOKUP_CACHE_TIMEOUT,
+            is_published=True,
+            created_at__lte=timezone.now()
+        )
+
+    def get_queryset(self):
+        return Post.published_posts.filter(category=self.get_category())
+
+
+class ProfilePostListApiView(PostListApiView):
+    def get_page_cache_scopes(self):
+        return (author_scope(self.get_profile().pk),)
+
+    @memoize_per_request
+    def get_profile(self):
+        return get_cached_object_or_404(
+            User, 'username', self.kwargs['username'], LOOKUP_CACHE_TIMEOUT
+        )
+
+    def get_queryset(self):
+        return Post.published_posts.filter(author=self.get_profile())
+
+
+class PostDetailApiView(ApiMixin, View):
+    fields = POST_FIELDS
+    converters = {'image': image_url}
+
+    def get_page_cache_scopes(self):
+        return (post_scope(self.kwargs['post_id']),)
+
+    def get(self, request, post_id):
+        queryset, keys = self.get_values(Post.published_posts.all())
+        return JsonResponse(
+            self.serialize(get_object_or_404(queryset, pk=post_id), keys)
+        )
+
+
+class CommentListApiView(ApiListMixin, View):
+    fields = COMMENT_FIELDS
+    ordering = ('created_at', 'id')
+    per_page = COMMENTS_PER_PAGE
+
+    def get_page_cache_scopes(self):
+        return (post_scope(self.kwargs['post_id']),)
+
+    def get_queryset(self):
+        post_id = self.kwargs['post_id']
+        if not Post.published_posts.filter(pk=post_id).exists():
+            raise Http404('Публикация не найдена')
+        return Comment.objects.filter(post_id=post_id)
+
+
+class CategoryListApiView(ApiListMixin, View):
+    fields = CATEGORY_FIELDS
+    ordering = ('title', 'id')
+
+    def get_queryset(self):
+        return Category.objects.filter(
+            is_published=True, created_at__lte=timezone.now()
+        )
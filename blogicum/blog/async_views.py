@@ -0,0 +1,49 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from blogicum.executors import lazy_executor
+
+get_executor = lazy_executor('ASYNC_VIEW_WORKERS', 'async-views')
+
+
+def call_view(view, request, kwargs):
+    """Выполняет представление в потоке пула и отрисовывает ответ там же.
+
+    Соединения с базой закрываются так же, как после обычного запроса:
+    сигнал request_finished до потоков пула не доходит.
+    """
+    close_old_connections()
+    try:
+        response = view(request, **kwargs)
+        if not getattr(response, 'is_rendered', True):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_view(view_class, **initkwargs):
+    """Асинхронный вариант класса-представления для запуска под ASGI.
+
+    Синхронные представления Django под ASGI выполняет по очереди в одном
+    потоке. Здесь запросы уходят в пул из ASYNC_VIEW_WORKERS потоков, так
+    что медленная база задерживает только свой запрос, а медленные
+    клиенты вовсе не занимают потоков.
+    """
+    view = view_class.as_view(**initkwargs)
+
+    async def wrapper(request, **kwargs):
+        return await sync_to_async(
+            call_view, thread_sensitive=False, executor=get_executor()
+        )(view, request, kwargs)
+
+    wrapper.view_class = view_class
+    return wrapper
+
+
+def page_view(view_class):
+    """Представление страницы для urls.py: асинхронное при ASYNC_VIEWS."""
+    if settings.ASYNC_VIEWS:
+        return async_view(view_class)
+    return view_class.as_view()
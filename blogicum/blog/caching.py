@@ -0,0 +1,251 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.db.models import Min
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.connection import ConnectionProxy
+
+from .models import Category, Location, Post
+
+
+User = get_user_model()
+
+# Области, по которым сбрасываются закэшированные страницы:
+# ALL_SCOPE задевает всё (категории, места, имена пользователей),
+# POSTS_SCOPE — общую ленту, остальные строятся функциями ниже.
+ALL_SCOPE = 'all'
+POSTS_SCOPE = 'posts'
+
+# Метки версий и отметка ближайшей публикации живут в отдельном кэше без
+# вытеснения: страницы и карточки не должны вытеснять их из общего кэша.
+STATE_CACHE_ALIAS = 'state'
+state_cache = ConnectionProxy(caches, STATE_CACHE_ALIAS)
+
+
+def memoize_per_request(method):
+    """Вычисляет метод представления один раз за запрос."""
+    attr_name = f'_{method.__name__}_result'
+
+    @wraps(method)
+    def wrapper(self):
+        if attr_name not in vars(self):
+            setattr(self, attr_name, method(self))
+        return getattr(self, attr_name)
+
+    return wrapper
+
+
+def lookup_cache_key(model, value):
+    return f'blog:lookup:{model._meta.label_lower}:{value}'
+
+
+# Поля, которые попадают в общий кэш объектов страниц: хеш пароля
+# и другие служебные поля пользователя там храниться не должны.
+LOOKUP_FIELDS = {
+    User: ('id', 'username', 'first_name', 'last_name', 'date_joined',
+           'is_staff'),
+}
+
+
+def get_cached_object_or_404(model, field, value, timeout, **filters):
+    """get_object_or_404 по уникальному полю с кэшем между запросами.
+
+    Запись сбрасывается при сохранении и удалении объекта, в том числе
+    под прежним значением поля (см. signals.py). Если поле у объекта
+    успело поменяться, кэш считается промахом.
+    """
+    key = lookup_cache_key(model, value)
+    instance = cache.get(key) if timeout else None
+    if instance is None or getattr(instance, field) != value:
+        queryset = model._default_manager.all()
+        if model in LOOKUP_FIELDS:
+            queryset = queryset.only(*LOOKUP_FIELDS[model])
+        instance = get_object_or_404(queryset, **{field: value}, **filters)
+        if timeout:
+            cache.set(key, instance, timeout)
+    return instance
+
+
+def invalidate_lookup(model, *values):
+    cache.delete_many([
+        lookup_cache_key(model, value) for value in values
+        if value is not None
+    ])
+
+
+def category_scope(category_id):
+    return f'category:{category_id}'
+
+
+def author_scope(author_id):
+    return f'author:{author_id}'
+
+
+def post_scope(post_id):
+    return f'post:{post_id}'
+
+
+def feed_scope(scope):
+    """Область ленты RSS/Atom и числа постов в списке: её сдвигают только
+    правки постов, но не комментарии.
+    """
+    return f'feed:{scope}'
+
+
+def object_scope(model, pk):
+    return f'object:{model._meta.label_lower}:{pk}'
+
+
+def _version_key(scope):
+    return f'blog:version:{scope}'
+
+
+def get_versions(*scopes):
+    """Возвращает метки версий областей, заводя недостающие.
+
+    Метка — момент последнего изменения в наносекундах, поэтому вытесненная
+    из кэша метка заменяется новой и не может совпасть со старой.
+    """
+    keys = {_version_key(scope): scope for scope in scopes}
+    versions = state_cache.get_many(keys)
+    for key in keys.keys() - versions.keys():
+        state_cache.add(key, time.time_ns(), None)
+        versions[key] = state_cache.get(key)
+    return tuple(versions[key] for key in keys)
+
+
+def bump_versions(*scopes):
+    version = time.time_ns()
+    state_cache.set_many(
+        {_version_key(scope): version for scope in scopes}, None
+    )
+
+
+def page_cache_key(request, scopes):
+    versions = get_versions(ALL_SCOPE, *scopes)
+    raw_key = '|'.join(
+        [request.get_full_path(), *(str(version) for version in versions)]
+    )
+    return f'blog:page:{hashlib.md5(raw_key.encode()).hexdigest()}'
+
+
+def count_cache_key(key, scopes):
+    versions = get_versions(ALL_SCOPE, *scopes)
+    raw_key = '|'.join([key, *(str(version) for version in versions)])
+    return f'blog:count:{hashlib.md5(raw_key.encode()).hexdigest()}'
+
+
+NEXT_PUBLICATION_KEY = 'blog:next-publication'
+NOTHING_SCHEDULED = 'nothing-scheduled'
+# Пометка «пересчитать»: хранится вместе с прежним значением, чтобы
+# не пропустить публикацию, наступившую до пересчёта.
+RECHECK_PUBLICATION = 'recheck'
+
+
+def next_publication_time():
+    """Ближайший pub_date из будущего среди опубликованных постов.
+
+    Значение ищется по частичному индексу post_published_pub_date_idx,
+    хранится в кэше до наступления этого момента и пересчитывается после
+    любого изменения поста (forget_next_publication_time).
+    """
+    now = timezone.now()
+    value = state_cache.get(NEXT_PUBLICATION_KEY)
+    recheck = (
+        isinstance(value, tuple) and value[0] == RECHECK_PUBLICATION
+    )
+    if recheck:
+        value = value[1]
+    if value is None or (value != NOTHING_SCHEDULED and value <= now):
+        # Запись истекает в момент публикации: вышедший пост мог попасть
+        # на любую страницу, поэтому их версии сдвигаются.
+        bump_versions(ALL_SCOPE)
+        recheck = True
+    if recheck:
+        value = Post.objects.filter(
+            is_published=True, pub_date__gt=now
+        ).aggregate(next_pub_date=Min('pub_date'))['next_pub_date']
+        if value is None:
+            state_cache.set(NEXT_PUBLICATION_KEY, NOTHING_SCHEDULED, None)
+        else:
+            state_cache.set(
+                NEXT_PUBLICATION_KEY,
+                value,
+                max(1, int((value - now).total_seconds()))
+            )
+    return None if value == NOTHING_SCHEDULED else value
+
+
+def forget_next_publication_time():
+    """Помечает ближайший pub_date для пересчёта после правки поста.
+
+    Запись не удаляется: сохранение поста само по себе не сдвигает
+    версии всех страниц, но публикация, наступившая до пересчёта,
+    должна их сдвинуть.
+    """
+    value = state_cache.get(NEXT_PUBLICATION_KEY)
+    if value is None or (
+        isinstance(value, tuple) and value[0] == RECHECK_PUBLICATION
+    ):
+        return
+    state_cache.set(NEXT_PUBLICATION_KEY, (RECHECK_PUBLICATION, value), None)
+
+
+def page_validators(request, scopes, *private_parts):
+    """Валидаторы ETag и Last-Modified страницы для условных запросов.
+
+    Считаются по меткам версий из кэша, без запросов к таблицам постов и
+    комментариев. Выход отложенного поста тоже сдвигает версии (см.
+    next_publication_time), поэтому Last-Modified — самая поздняя метка.
+    private_parts отличают варианты страницы для разных пользователей.
+    """
+    next_publication_time()
+    versions = get_versions(ALL_SCOPE, *scopes)
+    raw_etag = '|'.join([
+        request.get_full_path(),
+        *(str(version) for version in versions),
+        *(str(part) for part in private_parts),
+    ])
+    return (
+        f'"{hashlib.md5(raw_etag.encode()).hexdigest()}"',
+        max(versions) // 10 ** 9
+    )
+
+
+def publication_aware_timeout(timeout):
+    """Срок жизни кэша, не заходящий за публикацию отложенного поста."""
+    next_pub_date = next_publication_time()
+    if next_pub_date is None:
+        return timeout
+    seconds = (next_pub_date - timezone.now()).total_seconds()
+    return max(0, min(timeout, int(seconds)))
+
+
+def set_card_versions(posts):
+    """Проставляет постам card_version — часть ключа кэша карточки.
+
+    В версию входят время изменения поста, число комментариев и версии
+    категории, места и автора; метки всех связанных объектов страницы
+    читаются из кэша одним запросом.
+    """
+    posts = list(posts)
+    scopes = {
+        post.pk: (
+            object_scope(Category, post.category_id),
+            object_scope(Location, post.location_id),
+            object_scope(User, post.author_id),
+        )
+        for post in posts
+    }
+    unique_scopes = sorted(set().union(*scopes.values()))
+    versions = dict(zip(unique_scopes, get_versions(*unique_scopes)))
+    for post in posts:
+        post.card_version = '-'.join([
+            str(post.updated_at.timestamp()),
+            str(post.comment_count),
+            *(str(versions[scope]) for scope in scopes[post.pk]),
+        ])
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+# Кэши, которые видит только один процесс.
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    """Сброс кэшей блога работает, только если кэш общий для процессов."""
+    return [
+        Warning(
+            f'Кэш {alias} ({config["BACKEND"]}) не общий для процессов '
+            'сервера.',
+            hint=(
+                'Версии страниц сдвигаются только в процессе, который '
+                'обработал изменение: остальные будут отдавать устаревшие '
+                'страницы и ответы 304. Запускайте один процесс или задайте '
+                'общий кэш через CACHE_BACKEND и CACHE_LOCATION.'
+            ),
+            id='blog.W001',
+        )
+        for alias, config in settings.CACHES.items()
+        if config['BACKEND'] in PROCESS_LOCAL_CACHES
+    ]
@@ -0,0 +1,169 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .caching import next_publication_time
+from .models import (
+    COUNTED_FIELDS,
+    AuthorPostCounter,
+    Category,
+    CategoryPostCounter,
+    LocationPostCounter,
+    Post
+)
+
+# Модель счётчика и поле поста, по которому он ведётся.
+COUNTERS = (
+    (CategoryPostCounter, 'category_id'),
+    (AuthorPostCounter, 'author_id'),
+    (LocationPostCounter, 'location_id'),
+)
+
+
+def counted_posts():
+    """Посты, которые учитывают счётчики: видимые без учёта pub_date."""
+    return Post.objects.filter(is_published=True, category__is_published=True)
+
+
+def get_post_count(counter_model, object_id):
+    """Число видимых постов категории, автора или места.
+
+    Счётчик читается по первичному ключу. Отложенные посты вычитаются
+    запросом по индексу, только если они вообще есть.
+    """
+    count = counter_model.objects.filter(
+        pk=object_id
+    ).values_list('count', flat=True).first() or 0
+    if count and next_publication_time() is not None:
+        field = dict(COUNTERS)[counter_model]
+        count -= counted_posts().filter(
+            pub_date__gt=timezone.now(), **{field: object_id}
+        ).count()
+    return count
+
+
+def post_state(post, stored=None):
+    """Значения полей поста, от которых зависят счётчики.
+
+    stored — значения из строки в базе по именам полей (см.
+    signals.stored_values); недостающие берутся из объекта.
+    """
+    stored = stored or {}
+    state = {}
+    for name in COUNTED_FIELDS:
+        attname = Post._meta.get_field(name).attname
+        state[attname] = stored.get(name, getattr(post, attname))
+    return state
+
+
+def change_counter(model, object_id, delta):
+    rows = model.objects.filter(pk=object_id)
+    if rows.update(count=Greatest(F('count') + delta, 0)) or delta < 0:
+        return
+    model.objects.bulk_create([model(pk=object_id)], ignore_conflicts=True)
+    rows.update(count=F('count') + delta)
+
+
+def update_post_counters(old, new):
+    """Переносит пост между счётчиками.
+
+    old и new — состояния поста из post_state() до и после изменения,
+    None для нового и удалённого поста.
+    """
+    category_ids = {
+        state['category_id'] for state in (old, new)
+        if state and state['is_published']
+        and state['category_id'] is not None
+    }
+    if not category_ids:
+        return
+    published = set(Category.objects.filter(
+        pk__in=category_ids, is_published=True
+    ).values_list('pk', flat=True))
+    deltas = defaultdict(int)
+    for state, sign in ((old, -1), (new, 1)):
+        if (
+            state and state['is_published']
+            and state['category_id'] in published
+        ):
+            for model, field in COUNTERS:
+                if state[field] is not None:
+                    deltas[model, state[field]] += sign
+    for (model, object_id), delta in deltas.items():
+        if delta:
+            change_counter(model, object_id, delta)
+
+
+def actual_counts(field, ids=None):
+    posts = counted_posts().exclude(**{field: None})
+    if ids is not None:
+        posts = posts.filter(**{f'{field}__in': ids})
+    return dict(
+        posts.order_by().values_list(field).annotate(count=Count('pk'))
+    )
+
+
+def recount(model, field, ids=None):
+    """Заново считает счётчики с указанными id (None — все)."""
+    actual = actual_counts(field, ids)
+    stale = model.objects.all()
+    if ids is not None:
+        stale = stale.filter(pk__in=ids)
+    stale.delete()
+    model.objects.bulk_create(
+        model(pk=object_id, count=count)
+        for object_id, count in actual.items()
+    )
+
+
+def rebuild_post_counters():
+    """Заново заполняет все счётчики.
+
+    Нужен после массовой загрузки постов в обход сигналов.
+    """
+    for model, field in COUNTERS:
+        recount(model, field)
+
+
+def wrong_post_counters():
+    """Неверные счётчики: (модель, id, сохранённое, верное число)."""
+    for model, field in COUNTERS:
+        stored = dict(model.objects.values_list('pk', 'count'))
+        actual = actual_counts(field)
+        for object_id in sorted(stored.keys() | actual.keys()):
+            if stored.get(object_id, 0) != actual.get(object_id, 0):
+                yield (
+                    model, object_id,
+                    stored.get(object_id, 0), actual.get(object_id, 0)
+                )
+
+
+def category_post_owners(category_id):
+    """Авторы и места постов категории: их счётчики зависят от того,
+    опубликована ли она.
+    """
+    posts = Post.objects.filter(
+        category_id=category_id, is_published=True
+    ).order_by()
+    return (
+        set(posts.values_list('author_id', flat=True)),
+        set(posts.exclude(location=None).values_list(
+            'location_id', flat=True
+        )),
+    )
+
+
+def recount_category(category_id, owners=None):
+    """Пересчитывает счётчики категории и авторов и мест её постов.
+
+    owners — результат category_post_owners(), собранный до удаления
+    категории: после него посты уже не ссылаются на неё.
+    """
+    author_ids, location_ids = owners or category_post_owners(category_id)
+    with transaction.atomic():
+        recount(CategoryPostCounter, 'category_id', [category_id])
+        recount(AuthorPostCounter, 'author_id', author_ids)
+        recount(LocationPostCounter, 'location_id', location_ids)
@@ -0,0 +1,201 @@
+import hashlib
+
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date
+from django.utils.text import Truncator
+
+from .caching import (
+    ALL_SCOPE,
+    POSTS_SCOPE,
+    author_scope,
+    category_scope,
+    feed_scope,
+    get_cached_object_or_404,
+    get_versions,
+    page_validators,
+    publication_aware_timeout
+)
+from .models import Category, Post
+from blogicum.constants import (
+    FEED_CACHE_TIMEOUT,
+    FEED_DESCRIPTION_WORDS,
+    FEED_ITEMS,
+    LOOKUP_CACHE_TIMEOUT
+)
+
+
+User = get_user_model()
+
+SNAPSHOT_FIELDS = (
+    'pk',
+    'title',
+    'text',
+    'pub_date',
+    'updated_at',
+    'author__username',
+    'author__first_name',
+    'author__last_name',
+    'category__title',
+)
+
+
+def get_feed_snapshot(scope, queryset):
+    """Последние FEED_ITEMS постов ленты в виде словарей.
+
+    Снимок лежит в кэше, пока не сдвинется версия ALL_SCOPE или области
+    ленты feed_scope(scope). Комментарии её не задевают, а правка поста
+    перестраивает только ленты, в которые он попадает.
+    """
+    versions = get_versions(ALL_SCOPE, feed_scope(scope))
+    raw_key = '|'.join([scope, *(str(version) for version in versions)])
+    key = f'blog:feed:{hashlib.md5(raw_key.encode()).hexdigest()}'
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = list(queryset.values(*SNAPSHOT_FIELDS)[:FEED_ITEMS])
+        timeout = publication_aware_timeout(FEED_CACHE_TIMEOUT)
+        if timeout > 0:
+            cache.set(key, snapshot, timeout)
+    return snapshot
+
+
+class PostsFeed(Feed):
+    """RSS-лента последних публикаций.
+
+    Элементы берутся из снимка get_feed_snapshot(), а повторные запросы
+    читалок с If-None-Match получают 304 без обращения к базе.
+    """
+
+    title = 'Блогикум'
+    description = 'Новые публикации всех авторов.'
+
+    def __call__(self, request, *args, **kwargs):
+        obj = self.get_object(request, *args, **kwargs)
+        etag, last_modified = page_validators(
+            request, (feed_scope(self.get_scope(obj)),)
+        )
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().__call__(request, *args, **kwargs)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+    def get_scope(self, obj):
+        return POSTS_SCOPE
+
+    def get_queryset(self, obj):
+        return Post.published_posts.all()
+
+    def link(self):
+        return reverse('blog:index')
+
+    def items(self, obj):
+        return get_feed_snapshot(self.get_scope(obj), self.get_queryset(obj))
+
+    def item_title(self, item):
+        return item['title']
+
+    def item_description(self, item):
+        return Truncator(item['text']).words(FEED_DESCRIPTION_WORDS)
+
+    def item_link(self, item):
+        return reverse('blog:post_detail', kwargs={'post_id': item['pk']})
+
+    def item_author_name(self, item):
+        full_name = (
+            f"{item['author__first_name']} {item['author__last_name']}"
+        ).strip()
+        return full_name or item['author__username']
+
+    def item_author_link(self, item):
+        return reverse(
+            'blog:profile', kwargs={'username': item['author__username']}
+        )
+
+    def item_pubdate(self, item):
+        return item['pub_date']
+
+    def item_updateddate(self, item):
+        return item['updated_at']
+
+    def item_categories(self, item):
+        return (item['category__title'],)
+
+
+class CategoryFeed(PostsFeed):
+    def get_object(self, request, category_slug):
+        return get_cached_object_or_404(
+            Category,
+            'slug',
+            category_slug,
+            LOOKUP_CACHE_TIMEOUT,
+            is_published=True,
+            created_at__lte=timezone.now()
+        )
+
+    def get_scope(self, obj):
+        return category_scope(obj.pk)
+
+    def get_queryset(self, obj):
+        return Post.published_posts.filter(category=obj)
+
+    def title(self, obj):
+        return f'Блогикум: {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse(
+            'blog:category_posts', kwargs={'category_slug': obj.slug}
+        )
+
+
+class ProfileFeed(PostsFeed):
+    def get_object(self, request, username):
+        return get_cached_object_or_404(
+            User, 'username', username, LOOKUP_CACHE_TIMEOUT
+        )
+
+    def get_scope(self, obj):
+        return author_scope(obj.pk)
+
+    def get_queryset(self, obj):
+        return Post.published_posts.filter(author=obj)
+
+    def title(self, obj):
+        return f'Блогикум: публикации {obj.get_full_name() or obj.username}'
+
+    def description(self, obj):
+        return f'Новые публикации пользователя {obj.username}.'
+
+    def link(self, obj):
+        return reverse('blog:profile', kwargs={'username': obj.username})
+
+
+class AtomFeedMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr('description', obj)
+
+
+class AtomPostsFeed(AtomFeedMixin, PostsFeed):
+    pass
+
+
+class AtomCategoryFeed(AtomFeedMixin, CategoryFeed):
+    pass
+
+
+class AtomProfileFeed(AtomFeedMixin, ProfileFeed):
+    pass
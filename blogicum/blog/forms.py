@@ -1,22 +1,78 @@
 from django import forms
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
+from PIL import Image
 
+from .images import normalize_orientation
 from .models import Comment, Post
 
 
 User = get_user_model()
 
 
+class BoundedImageField(forms.ImageField):
+    """Проверяет размеры фото по заголовку файла до полной проверки
+    Pillow, чтобы не разбирать огромные изображения целиком.
+    """
+
+    default_error_messages = {
+        'image_too_large': (
+            'Фото слишком большое: %(width)s×%(height)s пикселей, '
+            'допускается не больше %(limit)s по каждой стороне.'
+        ),
+    }
+
+    def to_python(self, data):
+        if data and hasattr(data, 'read'):
+            source = (
+                data.temporary_file_path()
+                if hasattr(data, 'temporary_file_path') else data
+            )
+            try:
+                with Image.open(source) as image:
+                    width, height = image.size
+            except Exception:
+                width = height = 0
+            if hasattr(data, 'seek'):
+                data.seek(0)
+            if max(width, height) > settings.MAX_IMAGE_SIDE:
+                raise ValidationError(
+                    self.error_messages['image_too_large'],
+                    code='image_too_large',
+                    params={
+                        'width': width,
+                        'height': height,
+                        'limit': settings.MAX_IMAGE_SIDE,
+                    },
+                )
+        return super().to_python(data)
+
+
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         exclude = ('is_published', 'author',)
+        field_classes = {'image': BoundedImageField}
         widgets = {
             'pub_date': forms.DateInput(
                 attrs={'type': 'date'}
             )
         }
 
+    def __init__(self, *args, upload_errors=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.upload_errors = upload_errors or {}
+
+    def clean_image(self):
+        if 'image' in self.upload_errors:
+            raise ValidationError(self.upload_errors['image'])
+        image = self.cleaned_data.get('image')
+        if isinstance(image, UploadedFile):
+            return normalize_orientation(image)
+        return image
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,223 @@
+import logging
+import os
+import shutil
+import tempfile
+from functools import partial
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import UploadedFile
+from django.db import connections, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from PIL import Image, ImageOps, features
+
+from .models import ImageVariantFile, Post
+from blogicum.constants import IMAGE_VARIANT_QUALITY, IMAGE_VARIANT_WIDTHS
+from blogicum.executors import lazy_executor
+
+logger = logging.getLogger(__name__)
+
+VARIANTS_DIR = 'posts_images/variants'
+
+EXIF_ORIENTATION = 0x0112
+JPEG_START_OF_SCAN = 0xDA
+JPEG_END_OF_IMAGE = 0xD9
+JPEG_METADATA_SEGMENTS = (0xE1, 0xED)
+
+get_executor = lazy_executor('IMAGE_PROCESSING_WORKERS', 'post-images')
+
+
+def variant_name(image_name, variant, extension):
+    stem = os.path.splitext(os.path.basename(image_name))[0]
+    return f'{VARIANTS_DIR}/{stem}_{variant}.{extension}'
+
+
+def get_formats():
+    formats = [('JPEG', 'jpg')]
+    if features.check('webp'):
+        formats.append(('WEBP', 'webp'))
+    return formats
+
+
+def encode(image, image_format):
+    if image_format == 'JPEG' or image.mode not in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGB')
+    else:
+        image = image.convert('RGBA')
+    buffer = BytesIO()
+    image.save(
+        buffer, image_format, quality=IMAGE_VARIANT_QUALITY, optimize=True
+    )
+    return ContentFile(buffer.getvalue())
+
+
+def normalize_orientation(uploaded):
+    """Поворачивает фото согласно EXIF и удаляет метаданные.
+
+    Фото без EXIF возвращается как есть. Заново сжимается только фото,
+    которое нужно повернуть: из остальных JPEG сегменты метаданных
+    вырезаются без декодирования. Результат пишется во временный файл,
+    а не в память.
+    """
+    uploaded.seek(0)
+    with Image.open(uploaded) as image:
+        exif = image.getexif()
+        if not exif or getattr(image, 'is_animated', False):
+            uploaded.seek(0)
+            return uploaded
+        result = UploadedFile(
+            tempfile.TemporaryFile(dir=settings.FILE_UPLOAD_TEMP_DIR),
+            uploaded.name, uploaded.content_type
+        )
+        if image.format == 'JPEG' and exif.get(EXIF_ORIENTATION, 1) == 1:
+            strip_jpeg_metadata(uploaded, result.file)
+        else:
+            image_format = image.format
+            image = ImageOps.exif_transpose(image)
+            options = {}
+            if image_format in ('JPEG', 'WEBP'):
+                options['quality'] = 90
+            if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+            image.save(result.file, image_format, **options)
+    result.size = result.file.tell()
+    result.seek(0)
+    return result
+
+
+def strip_jpeg_metadata(source, target):
+    """Копирует JPEG без сегментов APP1 (EXIF, XMP) и APP13 (IPTC)."""
+    source.seek(0)
+    target.write(source.read(2))
+    while True:
+        marker = source.read(2)
+        while marker[1:] == b'\xff':
+            # Байты-заполнители перед маркером.
+            marker = marker[1:] + source.read(1)
+        if (
+            len(marker) < 2 or marker[0] != 0xFF
+            or marker[1] in (JPEG_START_OF_SCAN, JPEG_END_OF_IMAGE)
+        ):
+            target.write(marker)
+            break
+        length = source.read(2)
+        size = int.from_bytes(length, 'big') - 2
+        if marker[1] in JPEG_METADATA_SEGMENTS:
+            source.seek(size, os.SEEK_CUR)
+        else:
+            target.write(marker + length + source.read(size))
+    shutil.copyfileobj(source, target)
+
+
+def variant_files(variants):
+    return {
+        name
+        for entry in (variants or {}).values()
+        for name in entry.values()
+        if isinstance(name, str)
+    }
+
+
+def update_variant_references(old_variants, new_variants):
+    """Переносит ссылки публикации со старых копий фото на новые.
+
+    Вызывается в транзакции сохранения публикации. Файлы, на которые не
+    осталось ссылок, удаляются после её фиксации.
+    """
+    old_names = variant_files(old_variants)
+    new_names = variant_files(new_variants)
+    added = new_names - old_names
+    if added:
+        ImageVariantFile.objects.bulk_create(
+            [ImageVariantFile(name=name) for name in added],
+            ignore_conflicts=True
+        )
+        ImageVariantFile.objects.filter(name__in=added).update(
+            references=F('references') + 1
+        )
+    released = old_names - new_names
+    if released:
+        ImageVariantFile.objects.filter(name__in=released).update(
+            references=Greatest(F('references') - 1, 0)
+        )
+        transaction.on_commit(partial(delete_unreferenced_variants, released))
+
+
+def delete_unreferenced_variants(names):
+    """Удаляет файлы копий, на которые больше не ссылается ни один пост.
+
+    Хранилище раскладывает файлы по хэшу содержимого, поэтому одинаковые
+    фото разных публикаций делят одни и те же копии.
+    """
+    with transaction.atomic():
+        unused = list(ImageVariantFile.objects.select_for_update().filter(
+            name__in=names, references=0
+        ).values_list('name', flat=True))
+        ImageVariantFile.objects.filter(name__in=unused).delete()
+    storage = Post._meta.get_field('image').storage
+    for name in unused:
+        storage.delete(name)
+
+
+def generate_variants(post_id, image_name):
+    """Сохраняет уменьшенные копии фото рядом с оригиналом.
+
+    Если пока шла обработка фото публикации заменили, результат
+    отбрасывается: новую копию подготовит следующая задача.
+    """
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or post.image.name != image_name:
+        return
+    with post.image.open('rb') as file:
+        source = ImageOps.exif_transpose(Image.open(file))
+        source.load()
+    storage = post.image.storage
+    variants = {}
+    for variant, width in IMAGE_VARIANT_WIDTHS.items():
+        image = source.copy()
+        image.thumbnail((width, source.height))
+        entry = {'width': image.width, 'height': image.height}
+        for image_format, extension in get_formats():
+            entry[extension] = storage.save(
+                variant_name(image_name, variant, extension),
+                encode(image, image_format)
+            )
+        variants[variant] = entry
+    post.refresh_from_db(fields=['image'])
+    if post.image.name != image_name:
+        return
+    post.image_variants = variants
+    post.save(update_fields=['image_variants', 'updated_at'])
+
+
+def process_variants(post_id, image_name):
+    try:
+        generate_variants(post_id, image_name)
+    except Exception:
+        logger.exception(
+            'Не удалось подготовить копии фото публикации %s', post_id
+        )
+
+
+def process_in_background(post_id, image_name):
+    try:
+        process_variants(post_id, image_name)
+    finally:
+        connections.close_all()
+
+
+def schedule_variants(post):
+    """Ставит подготовку копий фото в очередь после фиксации транзакции."""
+    if not post.image:
+        return
+    args = (post.pk, post.image.name)
+
+    def submit():
+        if settings.IMAGE_PROCESSING_WORKERS:
+            get_executor().submit(process_in_background, *args)
+        else:
+            process_variants(*args)
+
+    transaction.on_commit(submit)
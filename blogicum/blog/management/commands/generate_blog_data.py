@@ -0,0 +1,229 @@
+import random
+import time
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from blog.caching import (
+    ALL_SCOPE,
+    POSTS_SCOPE,
+    bump_versions,
+    forget_next_publication_time
+)
+from blog.counters import rebuild_post_counters
+from blog.models import Category, Comment, Location, Post
+from blog.search import rebuild_search_index
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу пользователями, категориями, местами, публикациями '
+        'и комментариями для нагрузочного тестирования.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1_000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--locations', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=100_000)
+        parser.add_argument('--comments', type=int, default=900_000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument(
+            '--days', type=int, default=365 * 3,
+            help='За сколько дней в прошлое распределяются pub_date.'
+        )
+        parser.add_argument(
+            '--future-share', type=float, default=0.02,
+            help='Доля отложенных публикаций (pub_date в будущем).'
+        )
+        parser.add_argument(
+            '--unpublished-share', type=float, default=0.05,
+            help='Доля снятых с публикации постов, категорий и мест.'
+        )
+        parser.add_argument(
+            '--comment-skew', type=float, default=1.0,
+            help=(
+                'Показатель закона Ципфа для числа комментариев у постов; '
+                '0 — равномерно.'
+            )
+        )
+
+    def handle(self, *args, **options):
+        for name in ('users', 'categories', 'posts'):
+            if options[name] < 1:
+                raise CommandError(f'--{name} должно быть не меньше 1.')
+        self.rnd = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.unpublished_share = options['unpublished_share']
+        started = time.monotonic()
+        with transaction.atomic():
+            user_ids = self.create_users(options['users'])
+            category_ids = self.create_categories(options['categories'])
+            location_ids = self.create_locations(options['locations'])
+            post_ids = self.create_posts(
+                options, user_ids, category_ids, location_ids
+            )
+            self.create_comments(post_ids, user_ids)
+            # Строки вставлены в обход сигналов, индексирующих текст
+            # и ведущих счётчики публикаций.
+            rebuild_search_index()
+            rebuild_post_counters()
+        bump_versions(ALL_SCOPE, POSTS_SCOPE)
+        forget_next_publication_time()
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.monotonic() - started:.1f} с.'
+        ))
+
+    def is_published(self):
+        return self.rnd.random() >= self.unpublished_share
+
+    def bulk_create(self, model, objects):
+        """Создаёт объекты пачками и возвращает их id по порядку."""
+        last_id = model.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+        model.objects.bulk_create(objects, batch_size=self.batch_size)
+        ids = list(
+            model.objects.filter(pk__gt=last_id).order_by('pk')
+            .values_list('pk', flat=True)
+        )
+        self.stdout.write(f'{model._meta.verbose_name_plural}: {len(ids)}')
+        return ids
+
+    def insert_rows(self, model, field_names, rows):
+        """Вставляет строки через executemany, минуя компиляцию ORM.
+
+        bulk_create тратит основное время на подготовку каждого значения,
+        поэтому для публикаций и комментариев значения готовятся здесь
+        один раз, а в базу уходят пачками по batch_size строк.
+        """
+        fields = [model._meta.get_field(name) for name in field_names]
+        last_id = model.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            connection.ops.quote_name(model._meta.db_table),
+            ', '.join(
+                connection.ops.quote_name(field.column) for field in fields
+            ),
+            ', '.join(['%s'] * len(fields))
+        )
+        batch = []
+        with connection.cursor() as cursor:
+            for row in rows:
+                batch.append(row)
+                if len(batch) == self.batch_size:
+                    cursor.executemany(sql, batch)
+                    batch = []
+            if batch:
+                cursor.executemany(sql, batch)
+        ids = list(
+            model.objects.filter(pk__gt=last_id).order_by('pk')
+            .values_list('pk', flat=True)
+        )
+        self.stdout.write(f'{model._meta.verbose_name_plural}: {len(ids)}')
+        return ids
+
+    def create_users(self, count):
+        offset = User.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+        return self.bulk_create(User, (
+            User(username=f'load_user_{offset + i}', password='!')
+            for i in range(count)
+        ))
+
+    def create_categories(self, count):
+        offset = Category.objects.aggregate(
+            last_id=Max('id')
+        )['last_id'] or 0
+        return self.bulk_create(Category, (
+            Category(
+                title=f'Категория {offset + i}',
+                description='Описание категории',
+                slug=f'load-category-{offset + i}',
+                is_published=self.is_published()
+            )
+            for i in range(count)
+        ))
+
+    def create_locations(self, count):
+        return self.bulk_create(Location, (
+            Location(name=f'Место {i}', is_published=self.is_published())
+            for i in range(count)
+        ))
+
+    def create_posts(self, options, user_ids, category_ids, location_ids):
+        now = timezone.now()
+        adapt = connection.ops.adapt_datetimefield_value
+        created_at = adapt(now)
+        past_seconds = options['days'] * 24 * 60 * 60
+        future_share = options['future_share']
+        self.comment_counts = self.distribute_comments(
+            options['comments'], options['posts'], options['comment_skew']
+        )
+        rnd = self.rnd
+
+        def rows():
+            for i in range(options['posts']):
+                if rnd.random() < future_share:
+                    offset = rnd.randrange(60, 30 * 24 * 60 * 60)
+                else:
+                    offset = -rnd.randrange(1, past_seconds)
+                yield (
+                    f'Публикация {i}',
+                    ' '.join(rnd.choices(WORDS, k=rnd.randrange(20, 200))),
+                    adapt(now + timedelta(seconds=offset)),
+                    rnd.choice(user_ids),
+                    rnd.choice(category_ids),
+                    rnd.choice(location_ids) if location_ids else None,
+                    self.is_published(),
+                    self.comment_counts[i],
+                    '',
+                    '{}',
+                    created_at,
+                    created_at,
+                )
+
+        return self.insert_rows(Post, (
+            'title', 'text', 'pub_date', 'author', 'category', 'location',
+            'is_published', 'comment_count', 'image', 'image_variants',
+            'created_at', 'updated_at'
+        ), rows())
+
+    def distribute_comments(self, total, posts, skew):
+        weights = [1 / (rank + 1) ** skew for rank in range(posts)]
+        self.rnd.shuffle(weights)
+        counts = [0] * posts
+        for index in self.rnd.choices(
+            range(posts), cum_weights=list(accumulate(weights)), k=total
+        ):
+            counts[index] += 1
+        return counts
+
+    def create_comments(self, post_ids, user_ids):
+        rnd = self.rnd
+        created_at = connection.ops.adapt_datetimefield_value(timezone.now())
+        self.insert_rows(Comment, (
+            'text', 'post', 'author', 'is_published', 'created_at'
+        ), (
+            (
+                ' '.join(rnd.choices(WORDS, k=rnd.randrange(3, 30))),
+                post_id,
+                rnd.choice(user_ids),
+                True,
+                created_at
+            )
+            for post_id, count in zip(post_ids, self.comment_counts)
+            for _ in range(count)
+        ))
+
+
+WORDS = (
+    'путешествие город море горы дорога поезд кофе утро вечер книга '
+    'python django код база данных запрос индекс кэш страница лента '
+    'рецепт суп пирог ужин завтрак друзья прогулка парк музей выставка'
+).split()
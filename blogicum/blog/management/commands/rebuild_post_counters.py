@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.counters import rebuild_post_counters, wrong_post_counters
+
+
+class Command(BaseCommand):
+    help = (
+        'Заново считает число видимых публикаций у категорий, авторов '
+        'и мест.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только показать неверные счётчики.'
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            wrong = list(wrong_post_counters())
+            for model, object_id, stored, actual in wrong:
+                self.stdout.write(
+                    f'{model._meta.verbose_name} #{object_id}: '
+                    f'{stored} -> {actual}'
+                )
+            self.stdout.write(f'Неверных счётчиков: {len(wrong)}')
+            return
+        with transaction.atomic():
+            fixed = len(list(wrong_post_counters()))
+            rebuild_post_counters()
+        self.stdout.write(
+            self.style.SUCCESS(f'Исправлено счётчиков: {fixed}')
+        )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        'Заново строит полнотекстовый индекс публикаций и комментариев '
+        '(таблицы FTS5 в SQLite).'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS('Поисковый индекс обновлён.'))
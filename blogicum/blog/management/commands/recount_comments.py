@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённое число комментариев у публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только показать публикации с неверным счётчиком.'
+        )
+
+    def handle(self, *args, **options):
+        wrong = Post.objects.with_wrong_comment_count()
+        if options['check']:
+            for post_id, stored, actual in wrong.values_list(
+                'id', 'comment_count', 'actual_comment_count'
+            ):
+                self.stdout.write(f'#{post_id}: {stored} -> {actual}')
+            self.stdout.write(f'Неверных счётчиков: {wrong.count()}')
+            return
+        with transaction.atomic():
+            fixed = wrong.count()
+            Post.objects.recount_comments()
+        self.stdout.write(
+            self.style.SUCCESS(f'Исправлено счётчиков: {fixed}')
+        )
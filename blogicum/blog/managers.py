@@ -1,13 +1,48 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 
-class PublishedPostManager(models.Manager):
-    def get_queryset(self):
-        return super().get_queryset().filter(
+class PostQuerySet(models.QuerySet):
+    def published(self):
+        return self.filter(
             is_published=True,
             category__is_published=True,
             pub_date__lte=timezone.now()
-        ).annotate(
-            comment_count=models.Count('comments')
-        ).order_by('-pub_date')
+        )
+
+    def with_related(self):
+        return self.select_related('author', 'category', 'location')
+
+    def for_feed(self):
+        """Посты для ленты: автор, категория и место в одном JOIN."""
+        return self.with_related().order_by('-pub_date', '-id')
+
+    def change_comment_count(self, delta):
+        return self.update(comment_count=models.F('comment_count') + delta)
+
+    def actual_comment_count(self):
+        comments = self.model._meta.get_field('comments').related_model
+        return Coalesce(
+            models.Subquery(
+                comments.objects.filter(
+                    post=models.OuterRef('pk')
+                ).order_by().values('post').annotate(
+                    count=models.Count('pk')
+                ).values('count')
+            ),
+            0
+        )
+
+    def with_wrong_comment_count(self):
+        return self.annotate(
+            actual_comment_count=self.actual_comment_count()
+        ).exclude(comment_count=models.F('actual_comment_count'))
+
+    def recount_comments(self):
+        return self.update(comment_count=self.actual_comment_count())
+
+
+class PublishedPostManager(models.Manager.from_queryset(PostQuerySet)):
+    def get_queryset(self):
+        return super().get_queryset().published().for_feed()
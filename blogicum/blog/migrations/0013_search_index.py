@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.db import migrations
+
+TOKENIZER = 'unicode61 remove_diacritics 2'
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE blog_post_fts USING fts5('
+            f"title, text, tokenize='{TOKENIZER}')"
+        )
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE blog_comment_fts USING fts5('
+            f"text, post_id UNINDEXED, tokenize='{TOKENIZER}')"
+        )
+        schema_editor.execute(
+            'INSERT INTO blog_post_fts (rowid, title, text) '
+            'SELECT id, title, text FROM blog_post'
+        )
+        schema_editor.execute(
+            'INSERT INTO blog_comment_fts (rowid, text, post_id) '
+            'SELECT id, text, post_id FROM blog_comment'
+        )
+    elif vendor == 'postgresql':
+        config = settings.SEARCH_CONFIG
+        schema_editor.execute(
+            'CREATE INDEX blog_post_search_idx ON blog_post USING GIN ('
+            "(setweight(to_tsvector(%s::regconfig, COALESCE((title)::text, "
+            "'')), 'A') || setweight(to_tsvector(%s::regconfig, "
+            "COALESCE((text)::text, '')), 'B')))",
+            (config, config)
+        )
+        schema_editor.execute(
+            'CREATE INDEX blog_comment_search_idx ON blog_comment USING GIN '
+            "(to_tsvector(%s::regconfig, COALESCE((text)::text, '')))",
+            (config,)
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE blog_post_fts')
+        schema_editor.execute('DROP TABLE blog_comment_fts')
+    elif vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX blog_post_search_idx')
+        schema_editor.execute('DROP INDEX blog_comment_search_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_post_image_variants'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 3.2.16 on 2026-10-18 18:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_post_counters(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    for model_name, field in (
+        ('CategoryPostCounter', 'category_id'),
+        ('AuthorPostCounter', 'author_id'),
+        ('LocationPostCounter', 'location_id'),
+    ):
+        model = apps.get_model('blog', model_name)
+        counts = Post.objects.filter(
+            is_published=True, category__is_published=True
+        ).exclude(**{field: None}).order_by().values_list(field).annotate(
+            count=models.Count('pk')
+        )
+        model.objects.bulk_create(
+            model(pk=object_id, count=count) for object_id, count in counts
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0014_comment_post_created_at_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorPostCounter',
+            fields=[
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Число публикаций')),
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='post_counter', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+            ],
+            options={
+                'verbose_name': 'счётчик публикаций автора',
+                'verbose_name_plural': 'Счётчики публикаций авторов',
+            },
+        ),
+        migrations.CreateModel(
+            name='CategoryPostCounter',
+            fields=[
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Число публикаций')),
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='post_counter', serialize=False, to='blog.category', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'счётчик публикаций категории',
+                'verbose_name_plural': 'Счётчики публикаций категорий',
+            },
+        ),
+        migrations.CreateModel(
+            name='LocationPostCounter',
+            fields=[
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Число публикаций')),
+                ('location', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='post_counter', serialize=False, to='blog.location', verbose_name='Местоположение')),
+            ],
+            options={
+                'verbose_name': 'счётчик публикаций места',
+                'verbose_name_plural': 'Счётчики публикаций мест',
+            },
+        ),
+        migrations.RunPython(fill_post_counters, migrations.RunPython.noop),
+    ]
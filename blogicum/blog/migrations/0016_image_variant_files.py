@@ -0,0 +1,51 @@
+# Generated by Django 3.2.16 on 2026-10-18 18:45
+
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def fill_variant_references(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    ImageVariantFile = apps.get_model('blog', 'ImageVariantFile')
+    references = Counter()
+    for variants in Post.objects.exclude(
+        image_variants={}
+    ).values_list('image_variants', flat=True).iterator():
+        references.update({
+            name
+            for entry in (variants or {}).values()
+            for name in entry.values()
+            if isinstance(name, str)
+        })
+    ImageVariantFile.objects.bulk_create(
+        (
+            ImageVariantFile(name=name, references=count)
+            for name, count in references.items()
+        ),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_post_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageVariantFile',
+            fields=[
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False, verbose_name='Файл')),
+                ('references', models.PositiveIntegerField(default=0, verbose_name='Число ссылок')),
+            ],
+            options={
+                'verbose_name': 'файл копии фото',
+                'verbose_name_plural': 'Файлы копий фото',
+            },
+        ),
+        migrations.RunPython(
+            fill_variant_references, migrations.RunPython.noop
+        ),
+    ]
@@ -1,14 +1,51 @@
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.http import HttpResponseRedirect
+from django.core.cache import cache
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.http import Http404, HttpResponseRedirect
+from django.middleware.csrf import get_token
 from django.urls import reverse_lazy
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 
+from .caching import (
+    page_cache_key,
+    page_validators,
+    publication_aware_timeout,
+    set_card_versions
+)
 from .forms import PostForm
+from .images import schedule_variants
 from .models import Comment, Post
+from .paginators import CachedCountPaginator, CursorPaginator
+from blogicum.constants import (
+    CARD_CACHE_TIMEOUT,
+    COMMENTS_PER_PAGE,
+    PAGE_CACHE_TIMEOUT
+)
+from blogicum.db import is_pinned_to_primary, replica_reads
 
 
-class OnlyAuthorMixin(UserPassesTestMixin):
+class CachedObjectMixin:
+    """Запоминает объект из get_object() до конца обработки запроса.
+
+    Представление создаётся заново на каждый запрос, поэтому проверка прав,
+    get/post и get_context_data получают один и тот же объект
+    без повторных запросов к базе.
+    """
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_cached_object'):
+            self._cached_object = super().get_object()
+        return self._cached_object
+
+
+class OnlyAuthorMixin(CachedObjectMixin, UserPassesTestMixin):
     def test_func(self):
-        return self.get_object().author == self.request.user
+        return self.get_object().author_id == self.request.user.pk
 
     def handle_no_permission(self):
         return HttpResponseRedirect(
@@ -24,12 +61,32 @@ class PostMixin(LoginRequiredMixin):
     template_name = 'blog/create.html'
 
 
+class VisiblePostMixin(LoginRequiredMixin):
+    pk_url_kwarg = 'post_id'
+
+    def get_queryset(self):
+        return Post.objects.with_related().filter(
+            Q(author=self.request.user)
+            | Q(is_published=True)
+            & Q(category__is_published=True)
+            & Q(pub_date__lte=timezone.now())
+        )
+
+
 class PostFormMixin:
     form_class = PostForm
 
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['upload_errors'] = getattr(self.request, 'upload_errors', {})
+        return kwargs
+
     def form_valid(self, form):
         form.instance.author = self.request.user
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        if 'image' in form.changed_data:
+            schedule_variants(self.object)
+        return response
 
 
 class CommentMixin(OnlyAuthorMixin):
@@ -43,5 +100,207 @@ class CommentSuccessUrlMixin(LoginRequiredMixin):
     def get_success_url(self):
         return reverse_lazy(
             'blog:post_detail',
-            kwargs={'post_id': self.object.post.pk}
+            kwargs={'post_id': self.object.post_id}
+        )
+
+
+class CursorPaginationMixin:
+    """Переключает список на постраничный вывод по курсору при ?cursor=.
+
+    Ссылка «вперёд» и в обычном режиме ведёт по курсору, так что обход
+    ленты вглубь не упирается в OFFSET.
+    """
+
+    cursor_kwarg = 'cursor'
+    cursor_ordering = ('-pub_date', '-id')
+
+    def paginate_queryset(self, queryset, page_size):
+        cursor_paginator = CursorPaginator(
+            queryset, page_size, ordering=self.cursor_ordering
+        )
+        cursor = self.request.GET.get(self.cursor_kwarg)
+        if cursor is None:
+            paginator, page, object_list, is_paginated = (
+                super().paginate_queryset(queryset, page_size)
+            )
+            page.object_list = list(page.object_list)
+            page.next_cursor = None
+            if page.has_next() and page.object_list:
+                page.next_cursor = cursor_paginator.encode_cursor(
+                    page.object_list[-1]
+                )
+            return paginator, page, page.object_list, is_paginated
+        try:
+            page = cursor_paginator.page(cursor)
+        except InvalidPage as error:
+            raise Http404(f'Неверная страница: {error}')
+        return (
+            cursor_paginator, page, page.object_list, page.has_other_pages()
+        )
+
+
+class CachedCountMixin:
+    """Берёт число постов списка из кэша вместо COUNT(*) на каждый запрос.
+
+    Ключ get_count_cache_key() различает представление и его фильтр, а
+    версии областей get_count_scopes() сдвигаются только при изменении
+    постов, так что новые комментарии счётчик не сбрасывают. Без ключа
+    число постов не кэшируется.
+    """
+
+    paginator_class = CachedCountPaginator
+
+    def get_count_cache_key(self):
+        return None
+
+    def get_count_scopes(self):
+        return ()
+
+    def get_count_source(self):
+        """Функция, возвращающая число постов без COUNT(*), или None."""
+        return None
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset,
+            per_page,
+            count_key=self.get_count_cache_key(),
+            count_scopes=self.get_count_scopes(),
+            count_source=self.get_count_source(),
+            **kwargs
+        )
+
+
+class CommentPageMixin:
+    """Выводит комментарии поста порциями по курсору в порядке
+    добавления, чтобы размер страницы не зависел от их числа.
+    """
+
+    comments_per_page = COMMENTS_PER_PAGE
+
+    def get_comment_page(self, post, cursor):
+        paginator = CursorPaginator(
+            post.comments.select_related('author'),
+            self.comments_per_page,
+            ordering=('created_at', 'id')
+        )
+        try:
+            return paginator.page(cursor)
+        except InvalidPage as error:
+            raise Http404(f'Неверная страница: {error}')
+
+
+class ConditionalGetMixin:
+    """Отвечает 304 Not Modified, если страница не менялась с прошлого
+    запроса клиента, не обращаясь к базе и не отрисовывая шаблон.
+
+    Валидаторы строятся по версиям областей из get_page_cache_scopes(),
+    пользователю и, для страниц с формой (etag_includes_csrf), по
+    CSRF-куке: иначе после повторного входа в форме остался бы
+    устаревший токен.
+    """
+
+    etag_includes_csrf = False
+
+    def get_page_cache_scopes(self):
+        return ()
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        private_parts = [request.user.pk]
+        if self.etag_includes_csrf:
+            get_token(request)
+            private_parts.append(request.META['CSRF_COOKIE'])
+        etag, last_modified = page_validators(
+            request, self.get_page_cache_scopes(), *private_parts
         )
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        if request.user.is_authenticated:
+            patch_cache_control(response, no_cache=True, private=True)
+        else:
+            patch_cache_control(response, no_cache=True)
+        return response
+
+
+class AnonymousPageCacheMixin:
+    """Кэширует готовую страницу для анонимных посетителей.
+
+    Ключ включает версии областей из get_page_cache_scopes(), которые
+    сдвигаются сигналами при любом изменении показанных данных, а срок
+    жизни не выходит за момент публикации ближайшего отложенного поста.
+    """
+
+    page_cache_timeout = PAGE_CACHE_TIMEOUT
+
+    def get_page_cache_scopes(self):
+        return ()
+
+    def dispatch(self, request, *args, **kwargs):
+        if (
+            request.method not in ('GET', 'HEAD')
+            or request.user.is_authenticated
+        ):
+            return super().dispatch(request, *args, **kwargs)
+        key = page_cache_key(request, self.get_page_cache_scopes())
+        response = cache.get(key)
+        if response is not None:
+            return response
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            timeout = publication_aware_timeout(self.page_cache_timeout)
+            if timeout > 0:
+                self._store_in_page_cache(response, key, timeout)
+        return response
+
+    @staticmethod
+    def _store_in_page_cache(response, key, timeout):
+        def store(rendered):
+            cache.set(key, rendered, timeout)
+
+        if getattr(response, 'is_rendered', True):
+            store(response)
+        else:
+            response.add_post_render_callback(store)
+
+
+class PostCardCacheMixin:
+    """Готовит посты страницы к кэшированию карточек в post_card.html."""
+
+    card_cache_timeout = CARD_CACHE_TIMEOUT
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = context.get('page_obj')
+        if page is not None:
+            set_card_versions(page.object_list)
+        context['card_cache_timeout'] = self.card_cache_timeout
+        return context
+
+
+class ReplicaReadMixin:
+    """Читает данные страницы с реплики (если она настроена).
+
+    Шаблон рендерится внутри того же блока, чтобы ленивые запросы
+    из шаблона тоже ушли на реплику.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if (
+            request.method not in ('GET', 'HEAD')
+            or is_pinned_to_primary(request)
+        ):
+            return super().dispatch(request, *args, **kwargs)
+        with replica_reads():
+            response = super().dispatch(request, *args, **kwargs)
+            if not getattr(response, 'is_rendered', True):
+                response.render()
+        return response
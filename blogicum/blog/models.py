@@ -1,12 +1,17 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
 
-from .managers import PublishedPostManager
+from .managers import PostQuerySet, PublishedPostManager
 from blogicum.constants import MAX_TITLE_LENGTH, TRUNCATE_LENGTH
 
 
 User = get_user_model()
 
+# Поля поста, от которых зависит, в какие счётчики публикаций он входит.
+COUNTED_FIELDS = ('is_published', 'category', 'author', 'location')
+# Поля, которые сигналы сравнивают с заблокированной строкой в базе.
+STORED_FIELDS = COUNTED_FIELDS + ('image_variants',)
+
 
 class BaseModel(models.Model):
     is_published = models.BooleanField(
@@ -48,6 +53,12 @@ class Category(BaseModel):
     def __str__(self):
         return self.title[:TRUNCATE_LENGTH]
 
+    def save(self, *args, **kwargs):
+        # Счётчики постов при смене is_published пересчитываются
+        # сигналом в той же транзакции.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class Location(BaseModel):
     name = models.CharField(
@@ -103,18 +114,89 @@ class Post(BaseModel):
         blank=True,
         upload_to='posts_images'
     )
+    comment_count = models.PositiveIntegerField(
+        'Число комментариев',
+        default=0,
+        editable=False
+    )
+    updated_at = models.DateTimeField(
+        'Изменено',
+        auto_now=True
+    )
+    image_variants = models.JSONField(
+        'Уменьшенные копии фото',
+        default=dict,
+        blank=True,
+        editable=False
+    )
 
-    objects = models.Manager()
+    objects = PostQuerySet.as_manager()
     published_posts = PublishedPostManager()
 
     class Meta():
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('-pub_date',),
+                condition=models.Q(is_published=True),
+                name='post_published_pub_date_idx'
+            ),
+            models.Index(
+                fields=('category', '-pub_date'),
+                condition=models.Q(is_published=True),
+                name='post_category_pub_date_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_pub_date_idx'
+            ),
+        )
 
     def __str__(self):
         return self.title[:TRUNCATE_LENGTH]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def image_changed(self):
+        loaded = getattr(self, '_loaded_values', {}).get('image')
+        return str(loaded or '') != (self.image.name or '')
+
+    def save(self, *args, **kwargs):
+        # Счётчик комментариев меняется только через F-выражения,
+        # а копии фото — фоновой обработкой, поэтому обычное сохранение
+        # не должно затирать их старыми значениями.
+        skipped = {'comment_count', 'image_variants'}
+        if self.image_changed():
+            self.image_variants = {}
+            skipped.discard('image_variants')
+        if (
+            not self._state.adding
+            and self.pk is not None
+            and kwargs.get('update_fields') is None
+        ):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in skipped
+            ]
+        # Счётчики постов и ссылки на копии фото обновляются сигналом
+        # в той же транзакции; сохранение других полей её не открывает.
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or set(STORED_FIELDS) & set(update_fields):
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+        }
+
 
 class Comment(BaseModel):
     text = text = models.TextField(
@@ -136,6 +218,94 @@ class Comment(BaseModel):
     class Meta(BaseModel.Meta):
         verbose_name = ('комментарий')
         verbose_name_plural = ('Комментарии')
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_at_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:TRUNCATE_LENGTH]
+
+    def save(self, *args, **kwargs):
+        # Счётчик комментариев поста обновляется сигналом в той же
+        # транзакции.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class PostCounter(models.Model):
+    """Число постов, видимых на сайте без учёта даты публикации.
+
+    Учитываются посты с is_published в опубликованной категории.
+    Отложенные посты вычитаются при чтении (blog.counters).
+    """
+
+    count = models.PositiveIntegerField('Число публикаций', default=0)
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f'{self.pk}: {self.count}'
+
+
+class CategoryPostCounter(PostCounter):
+    category = models.OneToOneField(
+        Category,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='post_counter',
+        verbose_name='Категория'
+    )
+
+    class Meta:
+        verbose_name = 'счётчик публикаций категории'
+        verbose_name_plural = 'Счётчики публикаций категорий'
+
+
+class AuthorPostCounter(PostCounter):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='post_counter',
+        verbose_name='Автор'
+    )
+
+    class Meta:
+        verbose_name = 'счётчик публикаций автора'
+        verbose_name_plural = 'Счётчики публикаций авторов'
+
+
+class LocationPostCounter(PostCounter):
+    location = models.OneToOneField(
+        Location,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='post_counter',
+        verbose_name='Местоположение'
+    )
+
+    class Meta:
+        verbose_name = 'счётчик публикаций места'
+        verbose_name_plural = 'Счётчики публикаций мест'
+
+
+class ImageVariantFile(models.Model):
+    """Число публикаций, в копиях фото которых есть этот файл.
+
+    Имя файла — хэш содержимого, поэтому одинаковые фото разных
+    публикаций делят копии; файл удаляется, когда ссылок не остаётся.
+    """
+
+    name = models.CharField('Файл', max_length=255, primary_key=True)
+    references = models.PositiveIntegerField('Число ссылок', default=0)
+
+    class Meta:
+        verbose_name = 'файл копии фото'
+        verbose_name_plural = 'Файлы копий фото'
+
+    def __str__(self):
+        return f'{self.name}: {self.references}'
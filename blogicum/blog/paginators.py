@@ -0,0 +1,300 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, InvalidPage, Page, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .caching import count_cache_key, publication_aware_timeout
+from blogicum.constants import COUNT_CACHE_TIMEOUT
+from blogicum.db import run_in_parallel
+
+
+class UncountedPage(Page):
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class UncountedPaginator(Paginator):
+    """Постраничный вывод без COUNT(*): следующая страница определяется
+    по лишней записи, выбранной вместе с текущей страницей.
+    """
+
+    prev_next_only = True
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise InvalidPage('Номер страницы должен быть целым числом')
+        if number < 1:
+            raise EmptyPage('Номер страницы меньше 1')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        items = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not items and number > 1:
+            raise EmptyPage('На этой странице нет результатов')
+        return UncountedPage(
+            items[:self.per_page], number, self,
+            has_next=len(items) > self.per_page
+        )
+
+
+class ParallelCountPaginator(Paginator):
+    """Считает COUNT(*) и выбирает записи страницы одновременно.
+
+    Номер страницы проверяется уже после обоих запросов; для ?page=last
+    и при orphans число записей нужно заранее, и запросы идут по очереди.
+    """
+
+    def page(self, number):
+        if self.orphans:
+            return super().page(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            return super().page(number)
+        bottom = max(number - 1, 0) * self.per_page
+
+        def fetch():
+            return list(self.object_list[bottom:bottom + self.per_page])
+
+        if 'count' in vars(self):
+            items = fetch()
+        else:
+            # Первая функция заполняет кэшируемое свойство count.
+            items = run_in_parallel(lambda: self.count, fetch)[1]
+        return self._get_page(items, self.validate_number(number), self)
+
+
+def estimate_count(queryset):
+    """Число строк выборки по оценке планировщика PostgreSQL.
+
+    Для других баз возвращает None.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class CachedCountPaginator(ParallelCountPaginator):
+    """Пагинатор, который хранит число записей в кэше.
+
+    Ключ count_key задаёт представление (список и его фильтр), а версии
+    областей count_scopes сдвигаются при изменении постов. Точное число
+    может дать count_source — например, счётчик из blog.counters. Иначе,
+    если планировщик оценивает выборку больше чем
+    в PAGINATOR_ESTIMATE_THRESHOLD строк, вместо точного COUNT(*) берётся
+    оценка (count_is_estimated), а номера страниц за ней не отсекаются.
+
+    У страницы есть elided_page_range — номера страниц с пропусками
+    вместо полного page_range.
+    """
+
+    count_is_estimated = False
+
+    def __init__(self, *args, count_key=None, count_scopes=(),
+                 count_source=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_source = count_source
+        self.count_cache_key = (
+            None if count_key is None
+            else count_cache_key(count_key, count_scopes)
+        )
+
+    @cached_property
+    def count(self):
+        if self.count_cache_key is not None:
+            cached = cache.get(self.count_cache_key)
+            if cached is not None:
+                count, self.count_is_estimated = cached
+                return count
+        if self.count_source is not None:
+            count = self.count_source()
+        else:
+            count = estimate_count(self.object_list)
+            threshold = settings.PAGINATOR_ESTIMATE_THRESHOLD
+            if count is not None and count >= threshold:
+                self.count_is_estimated = True
+            else:
+                count = self.object_list.count()
+        if self.count_cache_key is not None:
+            timeout = publication_aware_timeout(COUNT_CACHE_TIMEOUT)
+            if timeout > 0:
+                cache.set(
+                    self.count_cache_key,
+                    (count, self.count_is_estimated),
+                    timeout
+                )
+        return count
+
+    def validate_number(self, number):
+        if not self.count_is_estimated:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise InvalidPage('Номер страницы должен быть целым числом')
+        if number < 1:
+            raise EmptyPage('Номер страницы меньше 1')
+        return number
+
+    def page(self, number):
+        page = super().page(number)
+        estimated = self.count_is_estimated
+        if estimated and not page.object_list and page.number > 1:
+            raise EmptyPage('На этой странице нет результатов')
+        page.elided_page_range = list(self.get_elided_page_range(
+            page.number, on_ends=0 if estimated else 2
+        ))
+        return page
+
+
+class CursorPage(Sequence):
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<Cursor page of {len(self)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Постраничный вывод по ключу сортировки (keyset pagination).
+
+    Вместо OFFSET страница выбирается условием «строго после» значений
+    полей сортировки последней записи, поэтому глубина страницы не влияет
+    на время запроса, а общее число записей не вычисляется.
+    """
+
+    prev_next_only = True
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-id')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = tuple(name.lstrip('-') for name in self.ordering)
+
+    def encode_cursor(self, item, direction='next'):
+        values = [self._get_value(item, name) for name in self.fields]
+        payload = json.dumps(
+            [direction, [self._serialize(value) for value in values]],
+            separators=(',', ':')
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, values = json.loads(base64.urlsafe_b64decode(padded))
+            if direction not in ('next', 'prev'):
+                raise ValueError(direction)
+            if len(values) != len(self.fields):
+                raise ValueError(values)
+            model = self.object_list.model
+            values = [
+                model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except (
+            binascii.Error, TypeError, ValueError, ValidationError
+        ) as error:
+            raise InvalidPage('Некорректный курсор') from error
+        return direction, values
+
+    def page(self, cursor=None):
+        queryset = self.object_list
+        ordering = self.ordering
+        direction = 'next'
+        if cursor:
+            direction, values = self.decode_cursor(cursor)
+            backwards = direction == 'prev'
+            if backwards:
+                ordering = tuple(self._invert(name) for name in ordering)
+            queryset = queryset.filter(self._after(values, backwards))
+        items = list(
+            queryset.order_by(*ordering)[:self.per_page + 1]
+        )
+        has_more = len(items) > self.per_page
+        items = items[:self.per_page]
+        if direction == 'prev':
+            items.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(cursor)
+        if not items:
+            return CursorPage(items, self, None, None)
+        return CursorPage(
+            items,
+            self,
+            next_cursor=(
+                self.encode_cursor(items[-1], 'next') if has_next else None
+            ),
+            previous_cursor=(
+                self.encode_cursor(items[0], 'prev') if has_previous else None
+            ),
+        )
+
+    def _after(self, values, backwards):
+        condition = Q()
+        equal = {}
+        for name, value in zip(self.ordering, values):
+            field = name.lstrip('-')
+            descending = name.startswith('-') != backwards
+            lookup = 'lt' if descending else 'gt'
+            condition |= Q(**equal, **{f'{field}__{lookup}': value})
+            equal[field] = value
+        return condition
+
+    @staticmethod
+    def _invert(name):
+        return name[1:] if name.startswith('-') else f'-{name}'
+
+    @staticmethod
+    def _get_value(item, name):
+        if isinstance(item, dict):
+            return item[name]
+        return getattr(item, name)
+
+    @staticmethod
+    def _serialize(value):
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return value
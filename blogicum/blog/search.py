@@ -0,0 +1,195 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.expressions import RawSQL
+
+from .models import Comment, Post
+
+POST_INDEX = 'blog_post_fts'
+COMMENT_INDEX = 'blog_comment_fts'
+MAX_TERMS = 10
+# Веса bm25 для столбцов title и text: совпадение в заголовке важнее.
+TITLE_WEIGHT = 10.0
+TEXT_WEIGHT = 1.0
+
+TERM_RE = re.compile(r'\w+')
+
+
+def get_terms(query):
+    return TERM_RE.findall(query.lower())[:MAX_TERMS]
+
+
+def uses_fts5():
+    return connection.vendor == 'sqlite'
+
+
+def fts5_query(terms):
+    """Каждое слово ищется по префиксу, все слова обязательны."""
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def tsquery(terms):
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+def search_posts(query):
+    """Опубликованные посты, в заголовке, тексте или комментариях которых
+    встречаются все слова запроса, от наиболее подходящих к остальным.
+
+    Посты, найденные только по комментариям, идут после найденных
+    по собственному тексту. Скрытые комментарии не учитываются.
+    """
+    terms = get_terms(query)
+    queryset = Post.published_posts.all()
+    if not terms:
+        return queryset.none()
+    if uses_fts5():
+        return Fts5SearchResults(queryset, fts5_query(terms))
+    return search_postgres(queryset, tsquery(terms))
+
+
+class Fts5SearchResults:
+    """Выдача поиска в SQLite, которую можно нарезать на страницы.
+
+    Совпадения и ранги считаются одним проходом по индексу FTS5, для
+    страницы отбираются только id видимых постов, и уже они загружаются
+    обычным запросом с select_related.
+    """
+
+    model = Post
+
+    def __init__(self, queryset, match):
+        self.queryset = queryset
+        self.match = match
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        limit = -1 if index.stop is None else max(index.stop - start, 0)
+        ids = self.ranked_ids(limit, start)
+        posts = self.queryset.in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+    def ranked_ids(self, limit, offset):
+        visible_sql, visible_params = self.queryset.filter(
+            pk=RawSQL('ranked.post_id', ())
+        ).order_by().values('pk').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT ranked.post_id FROM ('
+                'SELECT post_id, MIN(rank) AS rank FROM ('
+                f'SELECT rowid AS post_id, bm25({POST_INDEX}, %s, %s) AS rank '
+                f'FROM {POST_INDEX} WHERE {POST_INDEX} MATCH %s '
+                'UNION ALL '
+                f'SELECT {COMMENT_INDEX}.post_id, 0 FROM {COMMENT_INDEX} '
+                f'JOIN {Comment._meta.db_table} AS comment '
+                f'ON comment.id = {COMMENT_INDEX}.rowid '
+                f'WHERE {COMMENT_INDEX} MATCH %s AND comment.is_published'
+                ') GROUP BY post_id'
+                f') AS ranked WHERE EXISTS ({visible_sql}) '
+                'ORDER BY ranked.rank, ranked.post_id DESC '
+                'LIMIT %s OFFSET %s',
+                (
+                    TITLE_WEIGHT, TEXT_WEIGHT, self.match, self.match,
+                    *visible_params, limit, offset
+                )
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+def search_postgres(queryset, raw_query):
+    from django.contrib.postgres.search import (
+        SearchQuery,
+        SearchRank,
+        SearchVector
+    )
+
+    config = settings.SEARCH_CONFIG
+    search_query = SearchQuery(raw_query, config=config, search_type='raw')
+    vector = (
+        SearchVector('title', weight='A', config=config)
+        + SearchVector('text', weight='B', config=config)
+    )
+    comment_matches = Comment.objects.annotate(
+        search=SearchVector('text', config=config)
+    ).filter(post=OuterRef('pk'), is_published=True, search=search_query)
+    return queryset.annotate(
+        search=vector,
+        search_rank=SearchRank(vector, search_query),
+        comment_match=Exists(comment_matches),
+    ).filter(
+        Q(search=search_query) | Q(comment_match=True)
+    ).order_by('-search_rank', '-pub_date', '-id')
+
+
+def index_post(post, created=False):
+    if not uses_fts5():
+        return
+    with connection.cursor() as cursor:
+        if not created:
+            cursor.execute(
+                f'DELETE FROM {POST_INDEX} WHERE rowid = %s', [post.pk]
+            )
+        cursor.execute(
+            f'INSERT INTO {POST_INDEX} (rowid, title, text) '
+            'VALUES (%s, %s, %s)',
+            [post.pk, post.title, post.text]
+        )
+
+
+def unindex_post(post_id):
+    if not uses_fts5():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {POST_INDEX} WHERE rowid = %s', [post_id]
+        )
+
+
+def index_comment(comment, created=False):
+    if not uses_fts5():
+        return
+    with connection.cursor() as cursor:
+        if not created:
+            cursor.execute(
+                f'DELETE FROM {COMMENT_INDEX} WHERE rowid = %s',
+                [comment.pk]
+            )
+        cursor.execute(
+            f'INSERT INTO {COMMENT_INDEX} (rowid, text, post_id) '
+            'VALUES (%s, %s, %s)',
+            [comment.pk, comment.text, comment.post_id]
+        )
+
+
+def unindex_comment(comment_id):
+    if not uses_fts5():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {COMMENT_INDEX} WHERE rowid = %s', [comment_id]
+        )
+
+
+def rebuild_search_index():
+    """Заново заполняет таблицы FTS5 по всем постам и комментариям.
+
+    Нужен после массовой загрузки в обход сигналов. В PostgreSQL индекс
+    строится по выражению и обновляется базой сам.
+    """
+    if not uses_fts5():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {POST_INDEX}')
+        cursor.execute(
+            f'INSERT INTO {POST_INDEX} (rowid, title, text) '
+            f'SELECT id, title, text FROM {Post._meta.db_table}'
+        )
+        cursor.execute(f'DELETE FROM {COMMENT_INDEX}')
+        cursor.execute(
+            f'INSERT INTO {COMMENT_INDEX} (rowid, text, post_id) '
+            f'SELECT id, text, post_id FROM {Comment._meta.db_table}'
+        )
@@ -0,0 +1,275 @@
+from django.contrib.auth import get_user_model
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save
+)
+from django.dispatch import receiver
+
+from .caching import (
+    ALL_SCOPE,
+    POSTS_SCOPE,
+    author_scope,
+    bump_versions,
+    category_scope,
+    feed_scope,
+    forget_next_publication_time,
+    invalidate_lookup,
+    object_scope,
+    post_scope
+)
+from .counters import (
+    COUNTED_FIELDS,
+    category_post_owners,
+    post_state,
+    recount_category,
+    update_post_counters
+)
+from .images import update_variant_references
+from .models import STORED_FIELDS, Category, Comment, Location, Post
+from .search import index_comment, index_post, unindex_comment, unindex_post
+from blogicum.db import set_sqlite_pragmas
+from blogicum.metrics import install_query_recorder
+
+
+User = get_user_model()
+
+
+def post_scopes(post_id, *related):
+    """Области страниц, на которых виден пост.
+
+    related — пары (category_id, author_id): текущие и, если пост
+    перенесли, прежние значения.
+    """
+    scopes = {POSTS_SCOPE, post_scope(post_id)}
+    for category_id, author_id in related:
+        if category_id is not None:
+            scopes.add(category_scope(category_id))
+        scopes.add(author_scope(author_id))
+    return scopes
+
+
+def feed_scopes(*related):
+    """Области лент, в которые попадает пост; комментарии их не задевают."""
+    scopes = {feed_scope(POSTS_SCOPE)}
+    for category_id, author_id in related:
+        if category_id is not None:
+            scopes.add(feed_scope(category_scope(category_id)))
+        scopes.add(feed_scope(author_scope(author_id)))
+    return scopes
+
+
+@receiver(connection_created)
+def configure_connection(sender, connection, **kwargs):
+    set_sqlite_pragmas(connection)
+    install_query_recorder(connection)
+
+
+def stored_values(instance, fields, update_fields=None, lock=False):
+    """Значения полей, сохранённые в базе до записи объекта.
+
+    lock — заблокировать строку до конца транзакции, чтобы одновременная
+    правка дождалась этой записи и прочитала уже новые значения.
+    """
+    if update_fields is not None:
+        fields = [field for field in fields if field in update_fields]
+    if instance.pk is None or not fields:
+        return {}
+    rows = type(instance)._default_manager.filter(pk=instance.pk)
+    if lock:
+        rows = rows.select_for_update()
+    return rows.values(*fields).first() or {}
+
+
+@receiver(pre_save, sender=Category)
+def remember_stored_category(sender, instance, update_fields=None,
+                             **kwargs):
+    # Запись кэша под прежним slug иначе пережила бы переименование,
+    # а счётчики публикаций зависят от is_published.
+    instance._stored = stored_values(
+        instance, ('slug', 'is_published'), update_fields
+    )
+
+
+@receiver((post_save, post_delete), sender=Category)
+def invalidate_category(sender, instance, **kwargs):
+    invalidate_lookup(
+        Category, instance.slug, getattr(instance, '_stored', {}).get('slug')
+    )
+    bump_versions(ALL_SCOPE, object_scope(Category, instance.pk))
+
+
+@receiver(post_save, sender=Category)
+def recount_category_posts(sender, instance, created, **kwargs):
+    # Снятие категории с публикации скрывает все её посты, а правка
+    # названия или описания счётчики не меняет.
+    stored = getattr(instance, '_stored', {})
+    if not created and stored.get(
+        'is_published', instance.is_published
+    ) != instance.is_published:
+        recount_category(instance.pk)
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_post_owners(sender, instance, **kwargs):
+    instance._post_owners = category_post_owners(instance.pk)
+
+
+@receiver(post_delete, sender=Category)
+def recount_deleted_category_posts(sender, instance, **kwargs):
+    if instance.is_published:
+        recount_category(instance.pk, instance._post_owners)
+
+
+@receiver((post_save, post_delete), sender=Location)
+def invalidate_location(sender, instance, **kwargs):
+    bump_versions(ALL_SCOPE, object_scope(Location, instance.pk))
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, update_fields=None, **kwargs):
+    instance._stored = stored_values(instance, ('username',), update_fields)
+
+
+@receiver((post_save, post_delete), sender=User)
+def invalidate_user(sender, instance, created=False, update_fields=None,
+                    **kwargs):
+    invalidate_lookup(
+        User, instance.username,
+        getattr(instance, '_stored', {}).get('username')
+    )
+    # Вход пользователя обновляет только last_login, а новый
+    # пользователь ещё нигде не показан — страницы сбрасывать незачем.
+    if created or update_fields == frozenset(('last_login',)):
+        return
+    bump_versions(ALL_SCOPE, object_scope(User, instance.pk))
+
+
+@receiver(pre_save, sender=Post)
+def remember_stored_post(sender, instance, update_fields=None, **kwargs):
+    # Счётчики и ссылки на копии фото считаются от строки в базе, а не
+    # от значений, когда-то прочитанных объектом: иначе две одновременные
+    # правки поста их сбивают. Post.save для этих полей уже открыл
+    # транзакцию.
+    instance._stored = stored_values(
+        instance, STORED_FIELDS, update_fields, lock=True
+    )
+
+
+@receiver(pre_delete, sender=Post)
+def remember_deleted_post(sender, instance, **kwargs):
+    instance._stored = stored_values(instance, STORED_FIELDS, lock=True)
+
+
+@receiver((post_save, post_delete), sender=Post)
+def invalidate_post(sender, instance, **kwargs):
+    forget_next_publication_time()
+    stored = getattr(instance, '_stored', {})
+    related = (
+        (instance.category_id, instance.author_id),
+        (stored.get('category'), stored.get('author', instance.author_id))
+    )
+    bump_versions(
+        *post_scopes(instance.pk, *related), *feed_scopes(*related)
+    )
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_post(sender, instance, update_fields=None, **kwargs):
+    instance._stored = stored_values(instance, ('post',), update_fields)
+
+
+@receiver(post_save, sender=Comment)
+def update_comment_count_on_save(sender, instance, created, **kwargs):
+    old_post_id = getattr(instance, '_stored', {}).get('post')
+    if created:
+        Post.objects.filter(pk=instance.post_id).change_comment_count(1)
+    elif old_post_id is not None and old_post_id != instance.post_id:
+        Post.objects.filter(pk=old_post_id).change_comment_count(-1)
+        Post.objects.filter(pk=instance.post_id).change_comment_count(1)
+
+
+@receiver(post_delete, sender=Comment)
+def update_comment_count_on_delete(sender, instance, **kwargs):
+    # Срабатывает и при каскадном удалении комментариев вместе с их
+    # автором: счётчики чужих постов не расходятся с числом комментариев.
+    Post.objects.filter(pk=instance.post_id).change_comment_count(-1)
+
+
+@receiver((post_save, post_delete), sender=Comment)
+def invalidate_comment(sender, instance, **kwargs):
+    # Перенесённый комментарий пропадает со страниц прежнего поста.
+    post_ids = {
+        instance.post_id, getattr(instance, '_stored', {}).get('post')
+    } - {None}
+    scopes = set()
+    for post_id, *related in Post.objects.filter(
+        pk__in=post_ids
+    ).values_list('pk', 'category_id', 'author_id'):
+        scopes |= post_scopes(post_id, related)
+    bump_versions(*scopes)
+
+
+@receiver(post_save, sender=Post)
+def update_counters_on_post_save(sender, instance, created,
+                                 update_fields=None, **kwargs):
+    if update_fields is not None and not set(COUNTED_FIELDS) & set(
+        update_fields
+    ):
+        return
+    stored = getattr(instance, '_stored', {})
+    update_post_counters(
+        post_state(instance, stored) if stored and not created else None,
+        post_state(instance)
+    )
+
+
+@receiver(post_save, sender=Post)
+def update_image_variant_references(sender, instance, created,
+                                    update_fields=None, **kwargs):
+    # Имена копий задаёт хэш содержимого, так что новые копии не
+    # перезаписывают старые файлы: их надо удалить отдельно.
+    stored = getattr(instance, '_stored', {})
+    if created or 'image_variants' in stored:
+        update_variant_references(
+            stored.get('image_variants'), instance.image_variants
+        )
+
+
+@receiver(post_delete, sender=Post)
+def release_deleted_image_variants(sender, instance, **kwargs):
+    update_variant_references(
+        getattr(instance, '_stored', {}).get('image_variants'), None
+    )
+
+
+@receiver(post_delete, sender=Post)
+def update_counters_on_post_delete(sender, instance, **kwargs):
+    stored = getattr(instance, '_stored', {})
+    update_post_counters(
+        post_state(instance, stored) if stored else None, None
+    )
+
+
+@receiver(post_save, sender=Post)
+def update_post_search_index(sender, instance, created, update_fields=None,
+                             **kwargs):
+    if update_fields is None or {'title', 'text'} & set(update_fields):
+        index_post(instance, created)
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_search_index(sender, instance, **kwargs):
+    unindex_post(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def update_comment_search_index(sender, instance, created, **kwargs):
+    index_comment(instance, created)
+
+
+@receiver(post_delete, sender=Comment)
+def remove_comment_from_search_index(sender, instance, **kwargs):
+    unindex_comment(instance.pk)
@@ -0,0 +1,35 @@
+from django import template
+
+register = template.Library()
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, variant='card'):
+    """Фото публикации с набором уменьшенных копий в srcset.
+
+    Пока копии не готовы, выводится оригинал.
+    """
+    variants = post.image_variants or {}
+    if variant not in variants:
+        return {'post': post, 'src': post.image.url}
+    storage = post.image.storage
+    ordered = sorted(variants.values(), key=lambda entry: entry['width'])
+
+    def srcset(extension):
+        return ', '.join(
+            f'{storage.url(entry[extension])} {entry["width"]}w'
+            for entry in ordered if extension in entry
+        )
+
+    current = variants[variant]
+    return {
+        'post': post,
+        'src': storage.url(current['jpg']),
+        'srcset': srcset('jpg'),
+        'webp_srcset': srcset('webp'),
+        'sizes': (
+            f'(max-width: {current["width"]}px) 100vw, {current["width"]}px'
+        ),
+        'width': current['width'],
+        'height': current['height'],
+    }
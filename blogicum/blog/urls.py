@@ -1,13 +1,14 @@
 from django.urls import include, path
 
-from . import views
+from . import api, feeds, views
+from .async_views import page_view
 
 app_name = 'blog'
 
 posts_urls = [
     path(
         '<int:post_id>/',
-        views.PostDetailView.as_view(),
+        page_view(views.PostDetailView),
         name='post_detail'
     ),
     path(
@@ -25,6 +26,11 @@ posts_urls = [
         views.PostDeleteView.as_view(),
         name='delete_post'
     ),
+    path(
+        '<int:post_id>/comments/',
+        views.PostCommentsView.as_view(),
+        name='post_comments'
+    ),
     path(
         '<int:post_id>/comment/',
         views.CommentCreateView.as_view(),
@@ -42,25 +48,96 @@ posts_urls = [
     )
 ]
 
+api_urls = [
+    path(
+        'posts/',
+        api.PostListApiView.as_view(),
+        name='api_posts'
+    ),
+    path(
+        'posts/<int:post_id>/',
+        api.PostDetailApiView.as_view(),
+        name='api_post_detail'
+    ),
+    path(
+        'posts/<int:post_id>/comments/',
+        api.CommentListApiView.as_view(),
+        name='api_post_comments'
+    ),
+    path(
+        'categories/',
+        api.CategoryListApiView.as_view(),
+        name='api_categories'
+    ),
+    path(
+        'categories/<slug:category_slug>/posts/',
+        api.CategoryPostListApiView.as_view(),
+        name='api_category_posts'
+    ),
+    path(
+        'profiles/<str:username>/posts/',
+        api.ProfilePostListApiView.as_view(),
+        name='api_profile_posts'
+    ),
+]
+
 urlpatterns = [
     path(
         '',
-        views.IndexListView.as_view(),
+        page_view(views.IndexListView),
         name='index'
     ),
     path(
         'posts/', include(posts_urls)
     ),
+    path(
+        'api/', include(api_urls)
+    ),
+    path(
+        'rss/',
+        feeds.PostsFeed(),
+        name='feed'
+    ),
+    path(
+        'atom/',
+        feeds.AtomPostsFeed(),
+        name='feed_atom'
+    ),
     path(
         'category/<slug:category_slug>/',
-        views.CategoryPostsListView.as_view(),
+        page_view(views.CategoryPostsListView),
         name='category_posts'
     ),
+    path(
+        'category/<slug:category_slug>/rss/',
+        feeds.CategoryFeed(),
+        name='category_feed'
+    ),
+    path(
+        'category/<slug:category_slug>/atom/',
+        feeds.AtomCategoryFeed(),
+        name='category_feed_atom'
+    ),
     path(
         'profile/<str:username>/',
-        views.ProfileListView.as_view(),
+        page_view(views.ProfileListView),
         name='profile'
     ),
+    path(
+        'profile/<str:username>/rss/',
+        feeds.ProfileFeed(),
+        name='profile_feed'
+    ),
+    path(
+        'profile/<str:username>/atom/',
+        feeds.AtomProfileFeed(),
+        name='profile_feed_atom'
+    ),
+    path(
+        'search/',
+        views.SearchView.as_view(),
+        name='search'
+    ),
     path(
         'edit_profile/',
         views.ProfileUpdateView.as_view(),
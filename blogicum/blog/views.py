@@ -1,9 +1,10 @@
+from functools import partial
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db import models
-from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.http import urlencode
 from django.urls import reverse_lazy
 from django.views.generic import (
     CreateView,
@@ -13,52 +14,105 @@ from django.views.generic import (
     UpdateView
 )
 
+from .caching import (
+    POSTS_SCOPE,
+    author_scope,
+    category_scope,
+    feed_scope,
+    get_cached_object_or_404,
+    memoize_per_request,
+    post_scope
+)
 from .mixin import (
+    AnonymousPageCacheMixin,
+    CachedCountMixin,
+    CachedObjectMixin,
     CommentMixin,
+    CommentPageMixin,
     CommentSuccessUrlMixin,
+    ConditionalGetMixin,
+    CursorPaginationMixin,
     OnlyAuthorMixin,
+    PostCardCacheMixin,
     PostFormMixin,
-    PostMixin
+    PostMixin,
+    ReplicaReadMixin,
+    VisiblePostMixin
 )
+from .counters import get_post_count
 from .forms import CommentForm, PostForm, UserForm
-from .models import Category, Post
+from .models import AuthorPostCounter, Category, CategoryPostCounter, Post
+from .paginators import UncountedPaginator
+from .search import search_posts
+from blogicum.constants import LOOKUP_CACHE_TIMEOUT
 
 
 User = get_user_model()
 
 
-class IndexListView(ListView):
+class IndexListView(
+    ConditionalGetMixin,
+    AnonymousPageCacheMixin,
+    ReplicaReadMixin,
+    PostCardCacheMixin,
+    CursorPaginationMixin,
+    CachedCountMixin,
+    ListView
+):
     template_name = 'blog/index.html'
     paginate_by = 10
 
+    def get_page_cache_scopes(self):
+        return (POSTS_SCOPE,)
+
+    def get_count_cache_key(self):
+        return 'index'
+
+    def get_count_scopes(self):
+        return (feed_scope(POSTS_SCOPE),)
+
     def get_queryset(self):
         return Post.published_posts.all()
 
 
-class PostDetailView(LoginRequiredMixin, DetailView):
-    pk_url_kwarg = 'post_id'
+class PostDetailView(
+    VisiblePostMixin,
+    ConditionalGetMixin,
+    ReplicaReadMixin,
+    CachedObjectMixin,
+    CommentPageMixin,
+    DetailView
+):
     template_name = 'blog/detail.html'
+    etag_includes_csrf = True
 
-    def get_object(self, queryset=None):
-        post_id = self.kwargs.get(self.pk_url_kwarg)
-        return (
-            get_object_or_404(
-                Post.objects.filter(
-                    Q(pk=post_id)
-                    & Q(author=self.request.user)
-                    | Q(pk=post_id)
-                    & Q(is_published=True)
-                    & Q(category__is_published=True)
-                    & Q(pub_date__lte=timezone.now())
-                )
-            )
-        )
+    def get_page_cache_scopes(self):
+        return (post_scope(self.kwargs['post_id']),)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['post'] = self.get_object()
         context['form'] = CommentForm()
-        context['comments'] = self.get_object().comments.all()
+        context['comments'] = self.get_comment_page(
+            self.object, self.request.GET.get('comments')
+        )
+        return context
+
+
+class PostCommentsView(
+    VisiblePostMixin, ReplicaReadMixin, CommentPageMixin, DetailView
+):
+    """HTML-фрагмент со следующей порцией комментариев для «Показать
+    ещё» на странице поста.
+    """
+
+    template_name = 'includes/comment_list.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comments'] = self.get_comment_page(
+            self.object, self.request.GET.get('cursor')
+        )
+        context['fragment'] = True
         return context
 
 
@@ -80,28 +134,19 @@ class PostUpdateView(OnlyAuthorMixin, PostFormMixin, PostMixin, UpdateView):
 class PostDeleteView(OnlyAuthorMixin, PostMixin, DeleteView):
     success_url = reverse_lazy('blog:index')
 
-    def get_object(self, queryset=None):
-        return get_object_or_404(
-            Post,
-            pk=self.kwargs.get(self.pk_url_kwarg)
-        )
-
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['form'] = PostForm(instance=self.get_object())
+        context['form'] = PostForm(instance=self.object)
         return context
 
 
-class CommentCreateView(CommentSuccessUrlMixin, CreateView):
+class CommentCreateView(
+    CommentSuccessUrlMixin, CachedObjectMixin, CreateView
+):
+    queryset = Post.objects.all()
     pk_url_kwarg = 'post_id'
     form_class = CommentForm
 
-    def get_object(self, queryset=None):
-        return get_object_or_404(
-            Post,
-            pk=self.kwargs.get(self.pk_url_kwarg)
-        )
-
     def form_valid(self, form):
         form.instance.author = self.request.user
         form.instance.post = self.get_object()
@@ -116,25 +161,45 @@ class CommentDeleteView(CommentMixin, CommentSuccessUrlMixin, DeleteView):
     pass
 
 
-class CategoryPostsListView(ListView):
+class CategoryPostsListView(
+    ConditionalGetMixin,
+    AnonymousPageCacheMixin,
+    ReplicaReadMixin,
+    PostCardCacheMixin,
+    CursorPaginationMixin,
+    CachedCountMixin,
+    ListView
+):
     template_name = 'blog/category.html'
     paginate_by = 10
 
+    def get_page_cache_scopes(self):
+        return (category_scope(self.get_category().pk),)
+
+    def get_count_cache_key(self):
+        return f'category:{self.get_category().pk}'
+
+    def get_count_scopes(self):
+        return (feed_scope(category_scope(self.get_category().pk)),)
+
+    def get_count_source(self):
+        return partial(
+            get_post_count, CategoryPostCounter, self.get_category().pk
+        )
+
+    @memoize_per_request
     def get_category(self):
-        return get_object_or_404(
+        return get_cached_object_or_404(
             Category,
-            slug=self.kwargs['category_slug'],
+            'slug',
+            self.kwargs['category_slug'],
+            LOOKUP_CACHE_TIMEOUT,
             is_published=True,
             created_at__lte=timezone.now()
         )
 
     def get_queryset(self):
-        return self.get_category().posts.filter(
-            is_published=True,
-            pub_date__lte=timezone.now()
-        ).annotate(
-            comment_count=models.Count('comments')
-        ).order_by('-pub_date')
+        return Post.published_posts.filter(category=self.get_category())
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -142,23 +207,51 @@ class CategoryPostsListView(ListView):
         return context
 
 
-class ProfileListView(ListView):
+class ProfileListView(
+    ConditionalGetMixin,
+    AnonymousPageCacheMixin,
+    ReplicaReadMixin,
+    PostCardCacheMixin,
+    CursorPaginationMixin,
+    CachedCountMixin,
+    ListView
+):
     template_name = 'blog/profile.html'
     paginate_by = 10
 
+    def get_page_cache_scopes(self):
+        return (author_scope(self.get_profile().pk),)
+
+    def get_count_cache_key(self):
+        # Автор видит в профиле и неопубликованные посты.
+        is_owner = self.request.user == self.get_profile()
+        return f'profile:{self.get_profile().pk}:{is_owner:d}'
+
+    def get_count_scopes(self):
+        return (feed_scope(author_scope(self.get_profile().pk)),)
+
+    def get_count_source(self):
+        # Счётчик ведётся только по видимым постам.
+        if self.request.user == self.get_profile():
+            return None
+        return partial(
+            get_post_count, AuthorPostCounter, self.get_profile().pk
+        )
+
+    @memoize_per_request
     def get_profile(self):
-        return get_object_or_404(
+        return get_cached_object_or_404(
             User,
-            username=self.kwargs['username']
+            'username',
+            self.kwargs['username'],
+            LOOKUP_CACHE_TIMEOUT
         )
 
     def get_queryset(self):
         if self.request.user == self.get_profile():
             return Post.objects.filter(
                 author=self.get_profile()
-            ).annotate(
-                comment_count=models.Count('comments')
-            ).order_by('-pub_date')
+            ).for_feed()
         else:
             return Post.published_posts.filter(author=self.get_profile())
 
@@ -168,6 +261,27 @@ class ProfileListView(ListView):
         return context
 
 
+class SearchView(ReplicaReadMixin, PostCardCacheMixin, ListView):
+    template_name = 'blog/search.html'
+    paginate_by = 10
+    paginator_class = UncountedPaginator
+    max_query_length = 200
+
+    def get_search_query(self):
+        return self.request.GET.get('q', '').strip()[:self.max_query_length]
+
+    def get_queryset(self):
+        return search_posts(self.get_search_query())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.get_search_query()
+        context['query'] = query
+        if query:
+            context['page_query'] = urlencode({'q': query}) + '&'
+        return context
+
+
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     form_class = UserForm
     template_name = 'blog/user.html'
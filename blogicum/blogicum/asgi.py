@@ -1,7 +1,18 @@
+"""Точка входа ASGI.
+
+Запуск, например:
+
+    gunicorn blogicum.asgi:application -k uvicorn.workers.UvicornWorker
+
+Здесь по умолчанию включены асинхронные страницы (ASYNC_VIEWS): запросы
+к базе идут в пул из ASYNC_VIEW_WORKERS потоков, и соединений с базой
+нужно не меньше, чем потоков во всех процессах.
+"""
 import os
 
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+os.environ.setdefault('ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -1,2 +1,14 @@
 MAX_TITLE_LENGTH = 256
 TRUNCATE_LENGTH = 30
+LOOKUP_CACHE_TIMEOUT = 60 * 5
+PAGE_CACHE_TIMEOUT = 60 * 10
+CARD_CACHE_TIMEOUT = 60 * 60
+# Ширина уменьшенных копий фото публикации, пикселей.
+IMAGE_VARIANT_WIDTHS = {'card': 640, 'detail': 1280}
+IMAGE_VARIANT_QUALITY = 82
+COMMENTS_PER_PAGE = 50
+FEED_ITEMS = 20
+FEED_DESCRIPTION_WORDS = 60
+FEED_CACHE_TIMEOUT = 60 * 60
+API_PAGE_SIZE = 20
+COUNT_CACHE_TIMEOUT = 60 * 60
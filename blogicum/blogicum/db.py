@@ -0,0 +1,135 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+from .executors import lazy_executor
+
+REPLICA_ALIAS = 'replica'
+REPLICA_APP_LABELS = {'auth', 'blog'}
+PRIMARY_PIN_SESSION_KEY = 'db_primary_until'
+
+_replica_reads = ContextVar('replica_reads', default=False)
+_in_query_worker = ContextVar('in_query_worker', default=False)
+
+get_query_executor = lazy_executor(
+    'PARALLEL_QUERY_WORKERS', 'parallel-queries'
+)
+
+
+def set_sqlite_pragmas(connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@contextmanager
+def replica_reads():
+    """Направляет чтения внутри блока на реплику, если она настроена."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def is_pinned_to_primary(request):
+    session = getattr(request, 'session', None)
+    if session is None or PRIMARY_PIN_SESSION_KEY not in session:
+        return False
+    return session[PRIMARY_PIN_SESSION_KEY] > time.time()
+
+
+def _run_in_worker(context, func):
+    def call():
+        _in_query_worker.set(True)
+        return func()
+
+    try:
+        return context.run(call)
+    finally:
+        close_old_connections()
+
+
+def run_in_parallel(*funcs):
+    """Выполняет независимые запросы одновременно и возвращает результаты
+    функций в том же порядке.
+
+    Первая функция выполняется в вызывающем потоке, остальные — в пуле
+    из PARALLEL_QUERY_WORKERS потоков, у каждого из которых своё
+    соединение с базой, и с копией контекста вызывающего (замеры запроса,
+    чтение с реплики). Без PARALLEL_QUERIES, внутри транзакции (другие
+    соединения не видят её данных) и в потоках самого пула функции
+    выполняются по очереди.
+    """
+    if (
+        not settings.PARALLEL_QUERIES
+        or len(funcs) < 2
+        or _in_query_worker.get()
+        or any(connection.in_atomic_block for connection in connections.all())
+    ):
+        return [func() for func in funcs]
+    executor = get_query_executor()
+    futures = [
+        executor.submit(_run_in_worker, copy_context(), func)
+        for func in funcs[1:]
+    ]
+    first = funcs[0]()
+    return [first, *(future.result() for future in futures)]
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if (
+            _replica_reads.get()
+            and model._meta.app_label in REPLICA_APP_LABELS
+        ):
+            return REPLICA_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+class ReplicaPinningMiddleware:
+    """После изменяющего запроса читает с основной базы ещё несколько
+    секунд, чтобы автор сразу видел свой комментарий или пост.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        return self.pin(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.pin(request, await self.get_response(request))
+
+    def pin(self, request, response):
+        if (
+            request.method not in ('GET', 'HEAD', 'OPTIONS')
+            and response.status_code < 400
+            and hasattr(request, 'session')
+        ):
+            request.session[PRIMARY_PIN_SESSION_KEY] = (
+                time.time() + settings.DB_REPLICA_PIN_SECONDS
+            )
+        return response
@@ -0,0 +1,26 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+
+def lazy_executor(workers_setting, thread_name_prefix):
+    """Возвращает функцию, отдающую общий пул потоков.
+
+    Пул создаётся при первом вызове, один на процесс; число потоков
+    берётся из настройки workers_setting в этот момент.
+    """
+    executor = None
+    lock = threading.Lock()
+
+    def get_executor():
+        nonlocal executor
+        with lock:
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, workers_setting),
+                    thread_name_prefix=thread_name_prefix
+                )
+            return executor
+
+    return get_executor
@@ -0,0 +1,69 @@
+import mimetypes
+import posixpath
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .storage import get_content_hash
+
+# Файлы с хэшем содержимого в имени не меняются никогда.
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+MUTABLE_MAX_AGE = 60 * 60
+
+
+def serve_media(request, path):
+    """Отдаёт загруженный файл с заголовками кэширования.
+
+    При MEDIA_SENDFILE = 'x-sendfile' или 'x-accel-redirect' тело ответа
+    отправляет веб-сервер, а Python-процесс только проверяет путь и
+    формирует заголовки.
+    """
+    path = posixpath.normpath(path).lstrip('/')
+    try:
+        full_path = Path(safe_join(settings.MEDIA_ROOT, path))
+    except SuspiciousFileOperation:
+        raise Http404('Файл не найден')
+    if not full_path.is_file():
+        raise Http404('Файл не найден')
+    stat = full_path.stat()
+    content_hash = get_content_hash(path)
+    if content_hash:
+        etag = f'"{content_hash}"'
+    else:
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    if response is None:
+        response = build_file_response(full_path, path)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    if content_hash:
+        patch_cache_control(
+            response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True
+        )
+    else:
+        patch_cache_control(response, public=True, max_age=MUTABLE_MAX_AGE)
+    return response
+
+
+def build_file_response(full_path, path):
+    if not settings.MEDIA_SENDFILE:
+        return FileResponse(full_path.open('rb'))
+    content_type = (
+        mimetypes.guess_type(full_path.name)[0] or 'application/octet-stream'
+    )
+    response = HttpResponse(content_type=content_type)
+    if settings.MEDIA_SENDFILE == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = (
+            settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/') + '/' + path
+        )
+    else:
+        response['X-Sendfile'] = str(full_path)
+    return response
@@ -0,0 +1,273 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.template.backends.django import DjangoTemplates, Template, reraise
+from django.template.exceptions import TemplateDoesNotExist
+
+logger = logging.getLogger(__name__)
+
+TIME_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Замеры одного запроса: SQL-запросы и время отрисовки шаблонов."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = []
+        self.template_time = 0.0
+
+    @property
+    def db_time(self):
+        return sum(duration for _, duration in self.queries)
+
+    def top_queries(self, limit):
+        return sorted(
+            self.queries, key=lambda query: query[1], reverse=True
+        )[:limit]
+
+
+def record_query(execute, sql, params, many, context):
+    """Обёртка connection.execute_wrapper: учитывает запрос в замерах
+    текущего HTTP-запроса, если они ведутся.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries.append((sql, time.perf_counter() - started))
+
+
+def install_query_recorder(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.template_time += time.perf_counter() - started
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Шаблонный движок Django, учитывающий время отрисовки страниц.
+
+    Замеряется только шаблон верхнего уровня: {% include %} и
+    {% extends %} отрисовываются внутри него и не учитываются дважды.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(
+                self.engine.get_template(template_name), self
+            )
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def as_dict(self):
+        labels = [f'le_{bound}' for bound in self.bounds] + ['inf']
+        return {
+            'sum': round(self.sum, 3),
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class ViewStats:
+    def __init__(self):
+        self.count = 0
+        self.total_ms = Histogram(TIME_BUCKETS_MS)
+        self.db_ms = Histogram(TIME_BUCKETS_MS)
+        self.template_ms = Histogram(TIME_BUCKETS_MS)
+        self.queries = Histogram(QUERY_BUCKETS)
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'total_ms': self.total_ms.as_dict(),
+            'db_ms': self.db_ms.as_dict(),
+            'template_ms': self.template_ms.as_dict(),
+            'queries': self.queries.as_dict(),
+        }
+
+
+class MetricsRegistry:
+    """Гистограммы по именам адресов в памяти текущего процесса."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def observe(self, view_name, total_ms, db_ms, template_ms, queries):
+        with self._lock:
+            stats = self._views.setdefault(view_name, ViewStats())
+            stats.count += 1
+            stats.total_ms.observe(total_ms)
+            stats.db_ms.observe(db_ms)
+            stats.template_ms.observe(template_ms)
+            stats.queries.observe(queries)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: stats.as_dict()
+                for name, stats in sorted(self._views.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+registry = MetricsRegistry()
+
+
+def get_view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name
+
+
+def is_staff_request(request):
+    user = getattr(request, 'user', None)
+    return user is not None and user.is_staff
+
+
+def shows_server_timing(request):
+    """Нужен ли ответу заголовок Server-Timing.
+
+    Заголовок раскрывает число запросов и время базы, поэтому без
+    SERVER_TIMING он отдаётся только при DEBUG и сотрудникам.
+    """
+    return (
+        settings.SERVER_TIMING or settings.DEBUG or is_staff_request(request)
+    )
+
+
+class RequestMetricsMiddleware:
+    """Считает SQL-запросы, время базы, шаблонов и всего запроса.
+
+    Результат попадает в заголовок Server-Timing (см. shows_server_timing),
+    в гистограммы по имени адреса, а медленные запросы пишутся в журнал
+    вместе с самыми долгими SQL-запросами.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Так Django узнаёт, что цепочку под ASGI можно не переводить
+            # в синхронный режим (как в MiddlewareMixin).
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(
+            request, response, metrics, shows_server_timing(request)
+        )
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        server_timing = settings.SERVER_TIMING or settings.DEBUG
+        if (
+            not server_timing
+            and settings.SESSION_COOKIE_NAME in request.COOKIES
+        ):
+            # Пользователь из сессии может ещё не быть загружен, а запросы
+            # к базе из цикла событий запрещены. Без сессии посетитель
+            # анонимный, и общий поток синхронного кода не нужен.
+            server_timing = await sync_to_async(is_staff_request)(request)
+        return self.finish(request, response, metrics, server_timing)
+
+    def finish(self, request, response, metrics, server_timing):
+        total_ms = (time.perf_counter() - metrics.started) * 1000
+        db_ms = metrics.db_time * 1000
+        template_ms = metrics.template_time * 1000
+        view_name = get_view_name(request)
+        registry.observe(
+            view_name, total_ms, db_ms, template_ms, len(metrics.queries)
+        )
+        if server_timing:
+            response['Server-Timing'] = ', '.join((
+                f'db;dur={db_ms:.1f};desc="{len(metrics.queries)} queries"',
+                f'tpl;dur={template_ms:.1f}',
+                f'total;dur={total_ms:.1f}',
+            ))
+        if total_ms >= settings.SLOW_REQUEST_MS:
+            self.log_slow_request(
+                request, view_name, metrics, total_ms, db_ms, template_ms
+            )
+        return response
+
+    def log_slow_request(
+        self, request, view_name, metrics, total_ms, db_ms, template_ms
+    ):
+        top = '\n'.join(
+            f'  {duration * 1000:.1f} мс: {sql}'
+            for sql, duration in metrics.top_queries(
+                settings.SLOW_REQUEST_TOP_QUERIES
+            )
+        )
+        logger.warning(
+            'Медленный запрос %s %s (%s): %.1f мс, SQL %d шт. за %.1f мс, '
+            'шаблоны %.1f мс\n%s',
+            request.method, request.get_full_path(), view_name, total_ms,
+            len(metrics.queries), db_ms, template_ms, top
+        )
+
+
+@staff_member_required
+def metrics_view(request):
+    return JsonResponse({
+        'pid': os.getpid(),
+        'views': registry.snapshot(),
+    }, json_dumps_params={'ensure_ascii': False})
@@ -1,4 +1,5 @@
 import os
+import sys
 from pathlib import Path
 
 
@@ -26,6 +27,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blogicum.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -41,7 +43,7 @@ TEMPLATES_DIR = BASE_DIR / 'templates'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'blogicum.metrics.InstrumentedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -57,13 +59,115 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
+DB_ENGINE = os.getenv('DB_ENGINE', 'django.db.backends.sqlite3')
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': DB_ENGINE,
+        'NAME': os.getenv('DB_NAME', BASE_DIR / 'db.sqlite3'),
+        'USER': os.getenv('DB_USER', ''),
+        'PASSWORD': os.getenv('DB_PASSWORD', ''),
+        'HOST': os.getenv('DB_HOST', ''),
+        'PORT': os.getenv('DB_PORT', ''),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        'OPTIONS': (
+            {'timeout': int(os.getenv('DB_SQLITE_TIMEOUT', 20))}
+            if DB_ENGINE == 'django.db.backends.sqlite3' else {}
+        ),
     }
 }
 
+# Применяются к каждому новому соединению SQLite (см. blogicum/db.py).
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('DB_SQLITE_JOURNAL_MODE', 'wal'),
+    'synchronous': os.getenv('DB_SQLITE_SYNCHRONOUS', 'normal'),
+    'busy_timeout': int(os.getenv('DB_SQLITE_TIMEOUT', 20)) * 1000,
+    'mmap_size': int(os.getenv('DB_SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+}
+
+DATABASE_ROUTERS = []
+
+if os.getenv('DB_REPLICA_HOST') or os.getenv('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'HOST': os.getenv('DB_REPLICA_HOST', DATABASES['default']['HOST']),
+        'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_ROUTERS.append('blogicum.db.ReadReplicaRouter')
+    MIDDLEWARE.append('blogicum.db.ReplicaPinningMiddleware')
+
+# Сколько секунд после изменения данных пользователь читает с основной
+# базы, чтобы не увидеть отставание реплики.
+DB_REPLICA_PIN_SECONDS = int(os.getenv('DB_REPLICA_PIN_SECONDS', 5))
+
+# Асинхронные варианты страниц ленты, категории, профиля и поста для
+# запуска под ASGI (включаются в asgi.py) и число потоков для их работы
+# с базой.
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', '0') == '1'
+ASYNC_VIEW_WORKERS = int(os.getenv('ASYNC_VIEW_WORKERS', 16))
+
+# Независимые запросы страницы (COUNT(*) и выборка постов) выполняются
+# одновременно в отдельных потоках со своими соединениями — выигрыш
+# заметен, когда база далеко. Потоки держат соединения по CONN_MAX_AGE.
+PARALLEL_QUERIES = os.getenv('PARALLEL_QUERIES', '0') == '1'
+PARALLEL_QUERY_WORKERS = int(os.getenv('PARALLEL_QUERY_WORKERS', 8))
+
+# Начиная с этого числа строк по оценке планировщика списки постов
+# показывают оценку вместо точного COUNT(*) (только PostgreSQL).
+PAGINATOR_ESTIMATE_THRESHOLD = int(
+    os.getenv('PAGINATOR_ESTIMATE_THRESHOLD', 1_000_000)
+)
+
+# Журнал медленных запросов и заголовок Server-Timing. Заголовок
+# всегда виден сотрудникам и при DEBUG, а SERVER_TIMING=1 открывает его
+# всем посетителям.
+SERVER_TIMING = os.getenv('SERVER_TIMING', '0') == '1'
+SLOW_REQUEST_MS = int(os.getenv('SLOW_REQUEST_MS', 500))
+SLOW_REQUEST_TOP_QUERIES = 5
+
+# Версии страниц, отметка ближайшей публикации и кэши блога должны быть
+# общими для всех процессов сервера: иначе правка, обработанная одним
+# процессом, не сбросит кэш в остальных. Файловый кэш общий для процессов
+# на одной машине; для нескольких машин задайте, например,
+# CACHE_BACKEND=django.core.cache.backends.memcached.PyMemcacheCache
+# и CACHE_LOCATION=host:11211. LocMemCache годится только для одного
+# процесса (проверка blog.W001).
+#
+# Версии и отметка публикации лежат в отдельном кэше 'state', который
+# не должен вытеснять записи: пропавшая отметка считается наступившей
+# публикацией и сбрасывает все страницы. Для memcached укажите в
+# CACHE_STATE_LOCATION сервер без вытеснения (например, с -M).
+CACHE_BACKEND = os.getenv(
+    'CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'
+)
+
+
+def cache_options(max_entries):
+    # memcached сам решает, что вытеснять, и лишних параметров не принимает.
+    if 'memcached' in CACHE_BACKEND:
+        return {}
+    return {'MAX_ENTRIES': max_entries}
+
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv('CACHE_LOCATION', str(BASE_DIR / 'cache')),
+        'OPTIONS': cache_options(
+            int(os.getenv('CACHE_MAX_ENTRIES', 100_000))
+        ),
+    },
+    'state': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv(
+            'CACHE_STATE_LOCATION', str(BASE_DIR / 'cache-state')
+        ),
+        'OPTIONS': cache_options(sys.maxsize),
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -81,6 +185,9 @@ AUTH_PASSWORD_VALIDATORS = [
 
 LANGUAGE_CODE = 'ru-RU'
 
+# Конфигурация полнотекстового поиска PostgreSQL.
+SEARCH_CONFIG = os.getenv('SEARCH_CONFIG', 'russian')
+
 TIME_ZONE = 'Europe/Moscow'
 
 USE_I18N = True
@@ -96,6 +203,26 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 MEDIA_URL = '/media/'
+DEFAULT_FILE_STORAGE = 'blogicum.storage.HashedFileSystemStorage'
+# Отдача медиафайлов веб-сервером: '' — самим Django, 'x-sendfile'
+# (Apache, lighttpd) или 'x-accel-redirect' (nginx, внутренний location
+# MEDIA_ACCEL_REDIRECT_PREFIX смотрит в MEDIA_ROOT).
+MEDIA_SENDFILE = os.getenv('MEDIA_SENDFILE', '')
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv(
+    'MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/'
+)
+
+FILE_UPLOAD_HANDLERS = ['blogicum.uploads.LimitedTemporaryFileUploadHandler']
+# Ограничения на загружаемые фото: размер файла в байтах и длина
+# большей стороны в пикселях.
+MAX_IMAGE_UPLOAD_SIZE = int(
+    os.getenv('MAX_IMAGE_UPLOAD_SIZE', 10 * 1024 * 1024)
+)
+MAX_IMAGE_SIDE = int(os.getenv('MAX_IMAGE_SIDE', 8000))
+
+# Потоки для подготовки уменьшенных копий фото; 0 — обрабатывать сразу
+# в потоке запроса.
+IMAGE_PROCESSING_WORKERS = int(os.getenv('IMAGE_PROCESSING_WORKERS', 2))
 
 LOGIN_REDIRECT_URL = 'blog:index'
 LOGIN_URL = 'login'
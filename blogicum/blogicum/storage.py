@@ -0,0 +1,46 @@
+import hashlib
+import posixpath
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+HASHED_NAME_RE = re.compile(r'(?:^|/)[0-9a-f]{2}/([0-9a-f]{64})(?:\.\w+)?$')
+
+
+def get_content_hash(name):
+    """Хэш содержимого из имени файла, сохранённого HashedFileSystemStorage.
+
+    Для прочих имён возвращает None.
+    """
+    match = HASHED_NAME_RE.search(name)
+    return match.group(1) if match else None
+
+
+class HashedFileSystemStorage(FileSystemStorage):
+    """Хранит файлы под именем, равным SHA-256 их содержимого.
+
+    Одинаковые загрузки попадают в один файл, а содержимое по одному
+    адресу никогда не меняется, поэтому его можно кэшировать навсегда.
+    Каталог из upload_to сохраняется, файлы раскладываются по
+    подкаталогам из первых двух символов хэша.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        directory, filename = posixpath.split(name.replace('\\', '/'))
+        extension = posixpath.splitext(filename)[1].lower()
+        content_hash = digest.hexdigest()
+        name = posixpath.join(
+            directory, content_hash[:2], f'{content_hash}{extension}'
+        )
+        if self.exists(name):
+            return name
+        return self._save(name, content)
@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.core.exceptions import RequestDataTooBig
+from django.core.files.uploadhandler import (
+    SkipFile,
+    TemporaryFileUploadHandler
+)
+from django.template.defaultfilters import filesizeformat
+
+
+class LimitedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """Пишет загружаемые файлы во временный файл по частям и обрывает
+    загрузку, как только файл превышает MAX_IMAGE_UPLOAD_SIZE.
+
+    Причина отказа сохраняется в request.upload_errors, чтобы форма
+    показала её пользователю вместо молча пропущенного файла. Запрос,
+    который больше допустимого уже по заголовку Content-Length,
+    отклоняется целиком без чтения тела.
+    """
+
+    def handle_raw_input(self, input_data, META,  # noqa: N803
+                         content_length, boundary, encoding=None):
+        limit = (
+            settings.MAX_IMAGE_UPLOAD_SIZE
+            + (settings.DATA_UPLOAD_MAX_MEMORY_SIZE or 0)
+        )
+        if content_length > limit:
+            raise RequestDataTooBig(
+                'Тело запроса превышает допустимый размер загрузки.'
+            )
+        return super().handle_raw_input(
+            input_data, META, content_length, boundary, encoding
+        )
+
+    def new_file(self, field_name, file_name, content_type, content_length,
+                 charset=None, content_type_extra=None):
+        self.received = 0
+        if (
+            content_length is not None
+            and content_length > settings.MAX_IMAGE_UPLOAD_SIZE
+        ):
+            self.reject(field_name)
+            raise SkipFile
+        super().new_file(
+            field_name, file_name, content_type, content_length, charset,
+            content_type_extra
+        )
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.MAX_IMAGE_UPLOAD_SIZE:
+            self.reject(self.field_name)
+            raise SkipFile
+        return super().receive_data_chunk(raw_data, start)
+
+    def reject(self, field_name):
+        errors = self.request.__dict__.setdefault('upload_errors', {})
+        errors[field_name] = (
+            'Файл слишком большой: допускается не больше '
+            f'{filesizeformat(settings.MAX_IMAGE_UPLOAD_SIZE)}.'
+        )
@@ -1,10 +1,12 @@
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.contrib.auth.forms import UserCreationForm
 from django.urls import include, path, reverse_lazy
 from django.views.generic.edit import CreateView
 
+from .media import serve_media
+from .metrics import metrics_view
+
 handler403 = 'pages.views.csrf_failure'
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.internal_server_error'
@@ -23,13 +25,16 @@ auth_urls = [
 ]
 
 urlpatterns = [
+    path('admin/metrics/', metrics_view, name='request_metrics'),
     path('admin/', admin.site.urls),
     path('pages/', include('pages.urls', namespace='pages')),
     path('', include('blog.urls', namespace='blog')),
     path('auth/', include(auth_urls))
 ]
 
-if settings.DEBUG:
-    urlpatterns += static(
-        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
-    )
+if settings.DEBUG or settings.MEDIA_SENDFILE:
+    urlpatterns.append(path(
+        f'{settings.MEDIA_URL.lstrip("/")}<path:path>',
+        serve_media,
+        name='media'
+    ))
@@ -0,0 +1,37 @@
+from io import StringIO
+from typing import Dict, NamedTuple
+
+from django.core.management import call_command
+
+Volumes = NamedTuple(
+    "Volumes",
+    [("users", int), ("categories", int), ("locations", int),
+     ("posts", int), ("comments", int)],
+)
+
+SCALES: Dict[str, Volumes] = {
+    "small": Volumes(
+        users=20, categories=5, locations=5, posts=200, comments=1_000
+    ),
+    "full": Volumes(
+        users=10_000, categories=50, locations=200, posts=100_000,
+        comments=1_000_000,
+    ),
+}
+
+
+def seed(volumes: Volumes, seed_value: int = 0) -> None:
+    # Все публикации опубликованы, чтобы любой выбранный пост и его
+    # категория были доступны на замеряемых адресах.
+    call_command(
+        "generate_blog_data",
+        users=volumes.users,
+        categories=volumes.categories,
+        locations=volumes.locations,
+        posts=volumes.posts,
+        comments=volumes.comments,
+        seed=seed_value,
+        future_share=0,
+        unpublished_share=0,
+        stdout=StringIO(),
+    )
@@ -1,5 +1,6 @@
 import os
 import re
+import threading
 import time
 from http import HTTPStatus
 from inspect import getsource
@@ -19,6 +20,8 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.db.backends.utils import CursorWrapper
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -29,6 +32,9 @@ from mixer.backend.django import mixer as _mixer
 N_PER_FIXTURE = 3
 N_PER_PAGE = 10
 COMMENT_TEXT_DISPLAY_LEN_FOR_TESTS = 50
+# Время замеров сравнивается только в строгом режиме: на загруженной
+# машине оно нестабильно.
+BENCHMARK_STRICT = os.getenv("BENCHMARK_STRICT") == "1"
 
 KeyVal = NamedTuple("KeyVal", [("key", Optional[str]), ("val", Optional[str])])
 UrlRepr = NamedTuple("UrlRepr", [("url", str), ("repr", str)])
@@ -41,6 +47,35 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def inline_image_processing(settings):
+    # Фоновый поток с записью в общую базу в памяти блокирует таблицы
+    # для соединений самого теста.
+    settings.IMAGE_PROCESSING_WORKERS = 0
+
+
+@pytest.fixture(scope="session", autouse=True)
+def local_cache():
+    # Тесты идут в одном процессе, так что общий кэш им не нужен.
+    with override_settings(CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+        "state": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "state",
+        },
+    }):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    caches["state"].clear()
+    yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -96,6 +131,56 @@ pytest_plugins = [
 ]
 
 
+class SlowQueries:
+    """Замедляет SQL-запросы и запоминает, как они выполнялись.
+
+    peak — наибольшее число одновременных запросов, threads — имена
+    потоков, в которых они шли.
+    """
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+        self.threads = []
+
+    def execute(self, execute, cursor, sql, params):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            self.threads.append(threading.current_thread().name)
+        try:
+            time.sleep(self.delay)
+            return execute(cursor, sql, params)
+        finally:
+            with self.lock:
+                self.running -= 1
+
+    def reset(self):
+        with self.lock:
+            self.peak = self.running
+            self.threads.clear()
+
+
+@pytest.fixture
+def query_delay():
+    """Задержка каждого запроса в slow_db: имитирует медленную базу."""
+    return 0.02
+
+
+@pytest.fixture
+def slow_db(monkeypatch, query_delay):
+    queries = SlowQueries(query_delay)
+    execute = CursorWrapper.execute
+
+    def slow_execute(self, sql, params=None):
+        return queries.execute(execute, self, sql, params)
+
+    monkeypatch.setattr(CursorWrapper, "execute", slow_execute)
+    return queries
+
+
 @pytest.fixture
 def mixer():
     return _mixer
@@ -363,6 +448,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
@@ -0,0 +1,149 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+POST_LIST_URLS = (
+    "/api/posts/",
+    "/api/categories/{post.category.slug}/posts/",
+    "/api/profiles/{post.author.username}/posts/",
+)
+
+
+@pytest.mark.parametrize("url_template", POST_LIST_URLS)
+def test_post_list(unlogged_client, post_with_published_location,
+                   url_template):
+    post = post_with_published_location
+    url = url_template.format(post=post)
+    response = unlogged_client.get(url)
+    assert response.status_code == 200, (
+        f"Убедитесь, что адрес `{url}` отдаёт список публикаций."
+    )
+    data = response.json()
+    assert [item["id"] for item in data["results"]] == [post.id]
+    item = data["results"][0]
+    assert item["title"] == post.title
+    assert item["author"] == post.author.username
+    assert item["category"] == post.category.slug
+    assert item["location"] == post.location.name
+    assert item["image"] == post.image.url
+    assert data["next"] is None and data["previous"] is None
+
+
+def test_post_list_hides_unpublished_posts(
+        mixer, unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.blend("blog.Post", category=post.category, is_published=False)
+    mixer.blend(
+        "blog.Post", category=post.category,
+        pub_date=timezone.now() + timedelta(days=1)
+    )
+    mixer.blend("blog.Post", category__is_published=False)
+    results = unlogged_client.get("/api/posts/").json()["results"]
+    assert [item["id"] for item in results] == [post.id], (
+        "Убедитесь, что API отдаёт только опубликованные посты"
+        " из опубликованных категорий с наступившей датой публикации."
+    )
+
+
+def test_sparse_fields(unlogged_client, post_with_published_location):
+    with CaptureQueriesContext(connection) as context:
+        response = unlogged_client.get("/api/posts/?fields=title,author")
+    assert response.json()["results"] == [{
+        "title": post_with_published_location.title,
+        "author": post_with_published_location.author.username,
+    }], "Убедитесь, что ?fields= оставляет в ответе только указанные поля."
+    select = next(
+        query["sql"] for query in context.captured_queries
+        if "blog_post" in query["sql"]
+    )
+    assert '"blog_post"."text"' not in select, (
+        "Убедитесь, что из базы выбираются только запрошенные поля."
+    )
+
+
+def test_unknown_field_is_rejected(unlogged_client):
+    response = unlogged_client.get("/api/posts/?fields=title,password")
+    assert response.status_code == 400
+    assert "password" in response.json()["error"]
+
+
+def test_cursor_pagination(mixer, unlogged_client, published_category):
+    now = timezone.now()
+    posts = mixer.cycle(25).blend(
+        "blog.Post",
+        category=published_category,
+        pub_date=(now - timedelta(minutes=index) for index in range(25)),
+    )
+    first = unlogged_client.get(
+        "/api/posts/?fields=id&tag=a&tag=b"
+    ).json()
+    second = unlogged_client.get(first["next"]).json()
+    ids = [item["id"] for item in first["results"] + second["results"]]
+    assert ids == [post.id for post in posts], (
+        "Убедитесь, что страницы API по курсору идут подряд без пропусков."
+    )
+    assert second["next"] is None
+    assert "fields=id&tag=a&tag=b" in first["next"], (
+        "Убедитесь, что ссылка на следующую страницу сохраняет все"
+        " параметры запроса."
+    )
+    assert unlogged_client.get(second["previous"]).json() == first
+
+
+def test_invalid_cursor(unlogged_client):
+    assert unlogged_client.get("/api/posts/?cursor=xyz").status_code == 400
+
+
+def test_post_detail(unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    response = unlogged_client.get(f"/api/posts/{post.id}/?fields=id,text")
+    assert response.json() == {"id": post.id, "text": post.text}
+
+
+def test_unpublished_post_detail_returns_404(mixer, unlogged_client):
+    post = mixer.blend("blog.Post", is_published=False)
+    response = unlogged_client.get(f"/api/posts/{post.id}/")
+    assert response.status_code == 404
+    assert "error" in response.json()
+    assert unlogged_client.get(
+        f"/api/posts/{post.id}/comments/"
+    ).status_code == 404
+
+
+def test_comment_list(mixer, unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend("blog.Comment", post=post)
+    results = unlogged_client.get(
+        f"/api/posts/{post.id}/comments/"
+    ).json()["results"]
+    assert [item["id"] for item in results] == [
+        comment.id for comment in comments
+    ]
+    assert results[0]["author"] == comments[0].author.username
+    assert results[0]["post"] == post.id
+
+
+def test_category_list(
+        unlogged_client, published_category, another_category, mixer
+):
+    hidden = mixer.blend("blog.Category", is_published=False)
+    slugs = {
+        item["slug"]
+        for item in unlogged_client.get("/api/categories/").json()["results"]
+    }
+    assert {published_category.slug, another_category.slug} <= slugs
+    assert hidden.slug not in slugs
+
+
+def test_api_supports_conditional_get(
+        unlogged_client, post_with_published_location
+):
+    etag = unlogged_client.get("/api/posts/")["ETag"]
+    response = unlogged_client.get("/api/posts/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
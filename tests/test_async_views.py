@@ -0,0 +1,126 @@
+import asyncio
+import importlib
+import time
+from contextlib import contextmanager
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import clear_url_caches, resolve
+
+from conftest import BENCHMARK_STRICT
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+PAGE_URLS = (
+    "/",
+    "/category/{post.category.slug}/",
+    "/profile/{post.author.username}/",
+    "/posts/{post.id}/",
+)
+CONCURRENT_REQUESTS = 8
+
+
+def _reload_urls():
+    import blog.urls
+    import blogicum.urls
+
+    importlib.reload(blog.urls)
+    importlib.reload(blogicum.urls)
+    clear_url_caches()
+
+
+@contextmanager
+def _async_views(settings):
+    settings.ASYNC_VIEWS = True
+    _reload_urls()
+    try:
+        yield
+    finally:
+        settings.ASYNC_VIEWS = False
+        _reload_urls()
+
+
+@pytest.fixture
+def async_urls(settings):
+    with _async_views(settings):
+        yield
+
+
+def _get(client, url):
+    async def fetch():
+        return await client.get(url)
+
+    return async_to_sync(fetch)()
+
+
+def _measure_burst(url, param):
+    client = AsyncClient()
+
+    # Адреса запросов различаются, чтобы страницы не брались из кэша.
+    async def burst():
+        return await asyncio.gather(*(
+            client.get(f"{url}?{param}={number}")
+            for number in range(CONCURRENT_REQUESTS)
+        ))
+
+    started = time.perf_counter()
+    responses = async_to_sync(burst)()
+    elapsed = time.perf_counter() - started
+    assert all(response.status_code == 200 for response in responses)
+    return elapsed
+
+
+@pytest.mark.parametrize("url_template", PAGE_URLS)
+def test_async_pages_match_sync(
+        settings, user, post_with_published_location, url_template
+):
+    url = url_template.format(post=post_with_published_location)
+    client = AsyncClient()
+    client.force_login(user)
+    settings.SERVER_TIMING = True
+    sync_content = _get(client, url).content.decode()
+    with _async_views(settings):
+        assert asyncio.iscoroutinefunction(resolve(url).func), (
+            f"Убедитесь, что при ASYNC_VIEWS страница `{url}` обслуживается"
+            " асинхронным представлением."
+        )
+        response = _get(client, url)
+    content = response.content.decode()
+    assert response.status_code == 200
+    assert post_with_published_location.title in content
+    assert content.count("<article") == sync_content.count("<article")
+    assert '"0 queries"' not in response["Server-Timing"], (
+        "Убедитесь, что запросы асинхронных представлений попадают"
+        " в метрики запроса."
+    )
+
+
+def test_async_detail_requires_login(
+        async_urls, post_with_published_location
+):
+    response = _get(
+        AsyncClient(), f"/posts/{post_with_published_location.id}/"
+    )
+    assert response.status_code == 302
+
+
+def test_async_views_serve_concurrent_requests(
+        post_with_published_location, slow_db, settings
+):
+    url = f"/profile/{post_with_published_location.author.username}/"
+    sync_elapsed = _measure_burst(url, "sync")
+    assert slow_db.peak == 1
+    slow_db.reset()
+    with _async_views(settings):
+        async_elapsed = _measure_burst(url, "async")
+    assert 1 < slow_db.peak <= settings.ASYNC_VIEW_WORKERS, (
+        "Убедитесь, что асинхронные представления обрабатывают"
+        " одновременные запросы параллельно, не больше чем"
+        " в ASYNC_VIEW_WORKERS потоках."
+    )
+    if BENCHMARK_STRICT:
+        assert async_elapsed * 1.5 < sync_elapsed, (
+            "Убедитесь, что асинхронные представления обрабатывают"
+            " одновременные запросы быстрее синхронных."
+        )
@@ -0,0 +1,199 @@
+"""Бюджеты SQL-запросов, время и память для каждого адреса блога.
+
+Объём данных задаётся переменной окружения BENCHMARK_SCALE
+(`small` по умолчанию, `full` — 100k публикаций и 1M комментариев).
+Число запросов проверяется всегда; время и пиковая память сравниваются
+с сохранёнными значениями только при BENCHMARK_STRICT=1.
+BENCHMARK_UPDATE_BASELINES=1 перезаписывает benchmarks/baselines.json
+по результатам прогона.
+"""
+import json
+import os
+import time
+import tracemalloc
+from io import StringIO
+from pathlib import Path
+from typing import Callable, Dict, NamedTuple
+from urllib.parse import urlencode
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from benchmarks.seed import SCALES, seed
+from conftest import BENCHMARK_STRICT
+
+BASELINES_PATH = Path(__file__).parent / "benchmarks" / "baselines.json"
+SCALE = os.getenv("BENCHMARK_SCALE", "small")
+UPDATE_BASELINES = os.getenv("BENCHMARK_UPDATE_BASELINES") == "1"
+# Допустимое превышение сохранённых времени и памяти в строгом режиме.
+TOLERANCE = 1.5
+
+Route = NamedTuple(
+    "Route",
+    [("name", str), ("method", str), ("url", Callable), ("logged_in", bool)],
+)
+
+ROUTES = [
+    Route("blog:index", "get", lambda d: "/", False),
+    Route("blog:index (user)", "get", lambda d: "/", True),
+    Route("blog:post_detail", "get",
+          lambda d: f"/posts/{d.post.id}/", True),
+    Route("blog:create_post", "get", lambda d: "/posts/create/", True),
+    Route("blog:edit_post", "get",
+          lambda d: f"/posts/{d.post.id}/edit/", True),
+    Route("blog:delete_post", "get",
+          lambda d: f"/posts/{d.post.id}/delete/", True),
+    Route("blog:add_comment", "post",
+          lambda d: f"/posts/{d.post.id}/comment/", True),
+    Route("blog:edit_comment", "get",
+          lambda d: f"/posts/{d.post.id}/edit_comment/{d.comment.id}/",
+          True),
+    Route("blog:delete_comment", "get",
+          lambda d: f"/posts/{d.post.id}/delete_comment/{d.comment.id}/",
+          True),
+    Route("blog:category_posts", "get",
+          lambda d: f"/category/{d.post.category.slug}/", False),
+    Route("blog:category_posts (deep)", "get",
+          lambda d: f"/category/{d.post.category.slug}/?page=last", False),
+    Route("blog:profile", "get",
+          lambda d: f"/profile/{d.post.author.username}/", False),
+    Route("blog:profile (owner)", "get",
+          lambda d: f"/profile/{d.post.author.username}/", True),
+    Route("blog:edit_profile", "get", lambda d: "/edit_profile/", True),
+    Route("blog:post_comments", "get",
+          lambda d: f"/posts/{d.post.id}/comments/", True),
+    Route("blog:search", "get",
+          lambda d: "/search/?" + urlencode({"q": d.post.title.split()[0]}),
+          False),
+    Route("blog:feed", "get", lambda d: "/rss/", False),
+    Route("blog:feed_atom", "get", lambda d: "/atom/", False),
+    Route("blog:category_feed", "get",
+          lambda d: f"/category/{d.post.category.slug}/rss/", False),
+    Route("blog:category_feed_atom", "get",
+          lambda d: f"/category/{d.post.category.slug}/atom/", False),
+    Route("blog:profile_feed", "get",
+          lambda d: f"/profile/{d.post.author.username}/rss/", False),
+    Route("blog:profile_feed_atom", "get",
+          lambda d: f"/profile/{d.post.author.username}/atom/", False),
+    Route("blog:api_posts", "get", lambda d: "/api/posts/", False),
+    Route("blog:api_post_detail", "get",
+          lambda d: f"/api/posts/{d.post.id}/", False),
+    Route("blog:api_post_comments", "get",
+          lambda d: f"/api/posts/{d.post.id}/comments/", False),
+    Route("blog:api_categories", "get", lambda d: "/api/categories/", False),
+    Route("blog:api_category_posts", "get",
+          lambda d: f"/api/categories/{d.post.category.slug}/posts/", False),
+    Route("blog:api_profile_posts", "get",
+          lambda d: f"/api/profiles/{d.post.author.username}/posts/", False),
+    Route("pages:about", "get", lambda d: "/pages/about/", False),
+    Route("pages:rules", "get", lambda d: "/pages/rules/", False),
+]
+
+_results: Dict[str, dict] = {}
+
+
+def _load_baselines() -> dict:
+    if BASELINES_PATH.exists():
+        return json.loads(BASELINES_PATH.read_text(encoding="utf-8"))
+    return {"queries": {}, "scales": {}}
+
+
+@pytest.fixture(scope="module")
+def seeded_db(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        seed(SCALES[SCALE])
+    yield
+    with django_db_blocker.unblock():
+        call_command("flush", interactive=False, verbosity=0)
+        call_command("rebuild_search_index", stdout=StringIO())
+
+
+@pytest.fixture(scope="module", autouse=True)
+def write_baselines():
+    yield
+    if not UPDATE_BASELINES or not _results:
+        return
+    baselines = _load_baselines()
+    for name, result in _results.items():
+        baselines["queries"][name] = result["queries"]
+        baselines["scales"].setdefault(SCALE, {})[name] = {
+            "time_ms": result["time_ms"],
+            "peak_kb": result["peak_kb"],
+        }
+    BASELINES_PATH.write_text(
+        json.dumps(baselines, indent=2, ensure_ascii=False, sort_keys=True)
+        + "\n",
+        encoding="utf-8",
+    )
+
+
+@pytest.fixture
+def bench_data(seeded_db):
+    from blog.models import Post
+
+    post = (
+        Post.objects.select_related("author", "category")
+        .filter(comment_count__gt=0)
+        .order_by("-comment_count")
+        .first()
+    )
+    comment = post.comments.order_by("id").first()
+
+    class Data:
+        pass
+
+    data = Data()
+    data.post = post
+    data.comment = comment
+    return data
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("route", ROUTES, ids=[r.name for r in ROUTES])
+def test_route_budget(route: Route, bench_data):
+    client = Client()
+    if route.logged_in:
+        client.force_login(
+            bench_data.comment.author
+            if "comment" in route.name else bench_data.post.author
+        )
+    url = route.url(bench_data)
+    request = getattr(client, route.method)
+    data = {"text": "Новый комментарий"} if route.method == "post" else None
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    with CaptureQueriesContext(connection) as queries:
+        response = request(url, data) if data else request(url)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+
+    assert response.status_code < 400, (
+        f"Адрес `{url}` ({route.name}) вернул {response.status_code}."
+    )
+    result = {
+        "queries": len(queries),
+        "time_ms": round(elapsed_ms, 1),
+        "peak_kb": round(peak_kb, 1),
+    }
+    _results[route.name] = result
+
+    baselines = _load_baselines()
+    budget = baselines["queries"].get(route.name)
+    if budget is not None and not UPDATE_BASELINES:
+        assert result["queries"] <= budget, (
+            f"{route.name}: {result['queries']} SQL-запросов при бюджете"
+            f" {budget}. Запросы:\n"
+            + "\n".join(q["sql"] for q in queries.captured_queries)
+        )
+    scale_baseline = baselines["scales"].get(SCALE, {}).get(route.name)
+    if BENCHMARK_STRICT and scale_baseline and not UPDATE_BASELINES:
+        for metric in ("time_ms", "peak_kb"):
+            assert result[metric] <= scale_baseline[metric] * TOLERANCE, (
+                f"{route.name}: {metric} = {result[metric]}, сохранённое"
+                f" значение {scale_baseline[metric]}."
+            )
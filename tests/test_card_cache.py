@@ -0,0 +1,61 @@
+import pytest
+from django.core.cache import cache
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _card_keys():
+    return [
+        key for key in cache._cache
+        if "template.cache.post_card" in key
+    ]
+
+
+def test_post_card_is_cached_and_shared(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.get("/")
+    assert len(_card_keys()) == 1, (
+        "Убедитесь, что карточка публикации кэшируется."
+    )
+    user_client.get(f"/category/{post.category.slug}/")
+    user_client.get(f"/profile/{post.author.username}/")
+    assert len(_card_keys()) == 1, (
+        "Убедитесь, что главная, категория и профиль используют одну и ту же"
+        " закэшированную карточку."
+    )
+
+
+@pytest.mark.parametrize(
+    "change",
+    ["post", "category", "location", "author", "comment"],
+)
+def test_post_card_follows_changes(
+        mixer, user_client, post_with_published_location, change
+):
+    post = post_with_published_location
+    user_client.get("/")
+    if change == "post":
+        post.title = "Новый заголовок"
+        post.save()
+        expected = "Новый заголовок"
+    elif change == "category":
+        post.category.title = "Новая категория"
+        post.category.save()
+        expected = "Новая категория"
+    elif change == "location":
+        post.location.name = "Новое место"
+        post.location.save()
+        expected = "Новое место"
+    elif change == "author":
+        post.author.username = "renamed_author"
+        post.author.save()
+        expected = "@renamed_author"
+    else:
+        user_client.post(f"/posts/{post.id}/comment/", {"text": "Текст"})
+        expected = "Комментарии (1)"
+    assert expected in user_client.get("/").content.decode(), (
+        f"Убедитесь, что карточка публикации обновляется после изменения"
+        f" ({change})."
+    )
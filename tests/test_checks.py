@@ -0,0 +1,26 @@
+from blog.checks import check_shared_cache
+
+
+def test_process_local_cache_is_reported(settings):
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+    assert [error.id for error in check_shared_cache(None)] == ["blog.W001"]
+
+
+def test_shared_cache_passes(settings):
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": "/tmp/blogicum-cache",
+        },
+        "state": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": "/tmp/blogicum-cache-state",
+        },
+    }
+    assert check_shared_cache(None) == [], (
+        "Убедитесь, что общий для процессов кэш не вызывает предупреждения."
+    )
@@ -0,0 +1,78 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_views_maintain_comment_count(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    for text in ("Первый", "Второй"):
+        user_client.post(f"/posts/{post.id}/comment/", {"text": text})
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что при создании комментария увеличивается счётчик"
+        " комментариев публикации."
+    )
+
+    comment = post.comments.first()
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}/")
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что при удалении комментария уменьшается счётчик"
+        " комментариев публикации."
+    )
+
+
+def test_post_save_keeps_comment_count(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.post(f"/posts/{post.id}/comment/", {"text": "Текст"})
+    post.title = "Новый заголовок"
+    post.save()
+    post.refresh_from_db()
+    assert post.comment_count == 1
+
+
+def test_deleting_author_updates_comment_count(
+        mixer, post_with_published_location
+):
+    post = post_with_published_location
+    commenter = mixer.blend("auth.User")
+    mixer.cycle(2).blend("blog.Comment", post=post, author=commenter)
+    mixer.blend("blog.Comment", post=post)
+    assert Post.objects.get(pk=post.pk).comment_count == 3
+    commenter.delete()
+    assert Post.objects.get(pk=post.pk).comment_count == 1, (
+        "Убедитесь, что счётчик комментариев уменьшается, когда комментарии"
+        " удаляются вместе с их автором."
+    )
+
+
+def test_moving_comment_updates_comment_count(
+        mixer, post_with_published_location
+):
+    post = post_with_published_location
+    other = mixer.blend("blog.Post")
+    comment = mixer.blend("blog.Comment", post=post)
+    comment.post = other
+    comment.save()
+    assert Post.objects.get(pk=post.pk).comment_count == 0
+    assert Post.objects.get(pk=other.pk).comment_count == 1
+
+
+def test_recount_comments_command(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=0)
+
+    out = StringIO()
+    call_command("recount_comments", stdout=out)
+    assert Post.objects.get(pk=post.pk).comment_count == 3
+    assert "Исправлено счётчиков: 1" in out.getvalue()
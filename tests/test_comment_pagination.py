@@ -0,0 +1,77 @@
+from http import HTTPStatus
+
+import pytest
+
+from blog.models import Comment
+from blogicum.constants import COMMENTS_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def many_comments(user, post_with_published_location):
+    Comment.objects.bulk_create(
+        Comment(post=post_with_published_location, author=user,
+                text=f"Комментарий {i}")
+        for i in range(COMMENTS_PER_PAGE * 2 + 7)
+    )
+    return list(
+        Comment.objects.order_by("created_at", "id")
+        .values_list("id", flat=True)
+    )
+
+
+def test_detail_shows_first_comment_page(
+        user_client, post_with_published_location, many_comments
+):
+    response = user_client.get(f"/posts/{post_with_published_location.id}/")
+    page = response.context["comments"]
+    assert [c.id for c in page] == many_comments[:COMMENTS_PER_PAGE], (
+        "Убедитесь, что на странице поста выводится только первая порция"
+        " комментариев в порядке добавления."
+    )
+    assert page.has_next()
+    assert "data-fragment-url" in response.content.decode()
+
+
+def test_comment_fragments_load_remaining_comments(
+        user_client, post_with_published_location, many_comments
+):
+    post = post_with_published_location
+    cursor = user_client.get(
+        f"/posts/{post.id}/"
+    ).context["comments"].next_cursor
+    loaded = []
+    while cursor:
+        response = user_client.get(
+            f"/posts/{post.id}/comments/", {"cursor": cursor}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert "<html" not in response.content.decode(), (
+            "Убедитесь, что подгрузка комментариев возвращает фрагмент"
+            " страницы без общего шаблона."
+        )
+        page = response.context["comments"]
+        loaded += [c.id for c in page]
+        cursor = page.next_cursor
+    assert loaded == many_comments[COMMENTS_PER_PAGE:]
+
+
+def test_comment_fragment_respects_post_visibility(
+        another_user_client, post_with_published_location, many_comments
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    response = another_user_client.get(f"/posts/{post.id}/comments/")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_comment_page_uses_index(post_with_published_location):
+    queryset = post_with_published_location.comments.order_by(
+        "created_at", "id"
+    )[:COMMENTS_PER_PAGE]
+    assert "comment_post_created_at_idx" in queryset.explain(), (
+        "Убедитесь, что выборка комментариев поста использует индекс"
+        " `comment_post_created_at_idx`."
+    )
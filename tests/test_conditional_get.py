@@ -0,0 +1,120 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+FEED_URLS = (
+    "/",
+    "/category/{post.category.slug}/",
+    "/profile/{post.author.username}/",
+)
+PAGE_URLS = FEED_URLS + ("/posts/{post.id}/",)
+
+
+def _revalidate(client, url, etag):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    return response, len(context.captured_queries)
+
+
+@pytest.mark.parametrize("url_template", PAGE_URLS)
+def test_unchanged_page_is_not_rendered_again(
+        user_client, post_with_published_location, url_template
+):
+    url = url_template.format(post=post_with_published_location)
+    response = user_client.get(url)
+    assert response.status_code == 200
+    assert response.has_header("ETag"), (
+        f"Убедитесь, что страница `{url}` отдаётся с заголовком ETag."
+    )
+    assert response.has_header("Last-Modified")
+    revalidated = user_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert revalidated.status_code == 304, (
+        f"Убедитесь, что неизменившаяся страница `{url}` при повторном"
+        " запросе с If-None-Match возвращает ответ 304."
+    )
+    assert not revalidated.content
+    assert not revalidated.templates, (
+        "Убедитесь, что при ответе 304 шаблон страницы не отрисовывается."
+    )
+
+
+@pytest.mark.parametrize("url_template", FEED_URLS)
+def test_revalidation_does_not_query_posts(
+        unlogged_client, post_with_published_location, url_template
+):
+    url = url_template.format(post=post_with_published_location)
+    etag = unlogged_client.get(url)["ETag"]
+    response, queries = _revalidate(unlogged_client, url, etag)
+    assert response.status_code == 304
+    assert queries == 0, (
+        "Убедитесь, что валидаторы страницы для анонимных посетителей"
+        " считаются без запросов к базе данных."
+    )
+
+
+@pytest.mark.parametrize("url_template", PAGE_URLS)
+def test_comment_changes_etag(
+        mixer, user_client, post_with_published_location, url_template
+):
+    post = post_with_published_location
+    url = url_template.format(post=post)
+    etag = user_client.get(url)["ETag"]
+    mixer.blend("blog.Comment", post=post)
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что после добавления комментария страница"
+        f" `{url}` отдаётся заново."
+    )
+    assert response["ETag"] != etag
+
+
+@pytest.mark.parametrize("url_template", PAGE_URLS)
+def test_moved_comment_changes_old_post_etag(
+        mixer, user_client, post_with_published_location, url_template
+):
+    post = post_with_published_location
+    url = url_template.format(post=post)
+    comment = mixer.blend("blog.Comment", post=post)
+    other = mixer.blend("blog.Post")
+    etag = user_client.get(url)["ETag"]
+    comment.post = other
+    comment.save()
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что после переноса комментария на другой пост"
+        f" страница `{url}` прежнего поста отдаётся заново."
+    )
+
+
+def test_etag_depends_on_user(
+        user_client, another_user_client, post_with_published_location
+):
+    url = f"/profile/{post_with_published_location.author.username}/"
+    etag = user_client.get(url)["ETag"]
+    response = another_user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что страница, отрисованная для одного пользователя,"
+        " не считается актуальной для другого."
+    )
+
+
+def test_if_modified_since(unlogged_client, post_with_published_location):
+    response = unlogged_client.get("/")
+    revalidated = unlogged_client.get(
+        "/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    )
+    assert revalidated.status_code == 304
+
+
+def test_post_edit_changes_last_modified(
+        unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    response = unlogged_client.get("/")
+    post.title = "Новый заголовок"
+    post.save()
+    changed = unlogged_client.get("/", HTTP_IF_NONE_MATCH=response["ETag"])
+    assert changed.status_code == 200
+    assert "Новый заголовок" in changed.content.decode()
@@ -0,0 +1,30 @@
+import pytest
+from django.db import connection
+
+from blog.models import Comment, Post
+from blogicum.db import ReadReplicaRouter, replica_reads
+
+
+@pytest.mark.django_db
+def test_sqlite_pragmas_are_applied():
+    if connection.vendor != "sqlite":
+        pytest.skip("Проверка относится только к SQLite.")
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA synchronous")
+        assert cursor.fetchone()[0] == 1, (
+            "Убедитесь, что для соединений SQLite включается"
+            " `synchronous = NORMAL`."
+        )
+        cursor.execute("PRAGMA busy_timeout")
+        assert cursor.fetchone()[0] > 0
+
+
+def test_replica_router_routes_reads_only_inside_block():
+    router = ReadReplicaRouter()
+    assert router.db_for_read(Post) is None
+    with replica_reads():
+        assert router.db_for_read(Post) == "replica"
+        assert router.db_for_read(Comment) == "replica"
+        assert router.db_for_write(Post) == "default"
+    assert router.db_for_read(Post) is None
+    assert not router.allow_migrate("replica", "blog")
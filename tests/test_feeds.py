@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+FEED_URLS = (
+    "/rss/",
+    "/atom/",
+    "/category/{post.category.slug}/rss/",
+    "/category/{post.category.slug}/atom/",
+    "/profile/{post.author.username}/rss/",
+    "/profile/{post.author.username}/atom/",
+)
+
+
+def _get(client, url, **headers):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, **headers)
+    return response, len(context.captured_queries)
+
+
+@pytest.mark.parametrize("url_template", FEED_URLS)
+def test_feed_lists_published_posts(
+        unlogged_client, post_with_published_location, url_template
+):
+    post = post_with_published_location
+    url = url_template.format(post=post)
+    response = unlogged_client.get(url)
+    assert response.status_code == 200, (
+        f"Убедитесь, что лента `{url}` доступна анонимным пользователям."
+    )
+    assert "xml" in response["Content-Type"]
+    assert post.title in response.content.decode(), (
+        f"Убедитесь, что опубликованный пост попадает в ленту `{url}`."
+    )
+    assert f"/posts/{post.id}/" in response.content.decode()
+
+
+def test_feed_hides_unpublished_and_future_posts(
+        mixer, unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    hidden = mixer.blend(
+        "blog.Post", category=post.category, author=post.author,
+        is_published=False
+    )
+    future = mixer.blend(
+        "blog.Post", category=post.category, author=post.author,
+        pub_date=timezone.now() + timedelta(days=1)
+    )
+    for url in ("/rss/", f"/profile/{post.author.username}/rss/"):
+        content = unlogged_client.get(url).content.decode()
+        assert hidden.title not in content and future.title not in content, (
+            "Убедитесь, что в ленты попадают только опубликованные посты"
+            " с наступившей датой публикации."
+        )
+
+
+def test_unknown_category_feed_returns_404(unlogged_client):
+    assert unlogged_client.get("/category/unknown/rss/").status_code == 404
+
+
+@pytest.mark.parametrize("url_template", FEED_URLS)
+def test_feed_revalidation_returns_304_without_queries(
+        unlogged_client, post_with_published_location, url_template
+):
+    url = url_template.format(post=post_with_published_location)
+    etag = unlogged_client.get(url)["ETag"]
+    response, queries = _get(unlogged_client, url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304, (
+        f"Убедитесь, что неизменившаяся лента `{url}` отдаёт ответ 304."
+    )
+    assert queries == 0
+
+
+def test_feed_is_served_from_snapshot(
+        unlogged_client, post_with_published_location
+):
+    unlogged_client.get("/rss/")
+    response, queries = _get(unlogged_client, "/rss/")
+    assert response.status_code == 200
+    assert queries == 0, (
+        "Убедитесь, что лента строится из закэшированного снимка."
+    )
+
+
+def test_comment_does_not_invalidate_feed(
+        mixer, unlogged_client, post_with_published_location
+):
+    etag = unlogged_client.get("/rss/")["ETag"]
+    mixer.blend("blog.Comment", post=post_with_published_location)
+    response = unlogged_client.get("/rss/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304, (
+        "Убедитесь, что новый комментарий не сбрасывает ленту RSS."
+    )
+
+
+def test_post_edit_rebuilds_affected_feeds_only(
+        mixer, unlogged_client, post_with_published_location,
+        another_category
+):
+    post = post_with_published_location
+    other_url = f"/category/{another_category.slug}/rss/"
+    other_etag = unlogged_client.get(other_url)["ETag"]
+    unlogged_client.get("/rss/")
+    post.title = "Новый заголовок"
+    post.save()
+    assert "Новый заголовок" in unlogged_client.get("/rss/").content.decode()
+    response = unlogged_client.get(other_url, HTTP_IF_NONE_MATCH=other_etag)
+    assert response.status_code == 304, (
+        "Убедитесь, что правка поста не сбрасывает ленты других категорий."
+    )
@@ -0,0 +1,35 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_generate_blog_data_creates_consistent_rows():
+    call_command(
+        "generate_blog_data", users=5, categories=2, locations=2, posts=30,
+        comments=120, batch_size=7, stdout=StringIO(),
+    )
+    assert Post.objects.count() == 30
+    assert Comment.objects.count() == 120
+    assert not Post.objects.with_wrong_comment_count().exists(), (
+        "Убедитесь, что команда generate_blog_data заполняет comment_count"
+        " в соответствии с созданными комментариями."
+    )
+    assert Post.published_posts.exists()
+
+
+def test_generate_blog_data_is_reproducible():
+    options = dict(
+        users=3, categories=1, locations=0, posts=10, comments=40, seed=7,
+        stdout=StringIO(),
+    )
+    call_command("generate_blog_data", **options)
+    first = list(Post.objects.order_by("id").values_list("text", "pub_date"))
+    Post.objects.all().delete()
+    call_command("generate_blog_data", **options)
+    second = list(Post.objects.order_by("id").values_list("text", "pub_date"))
+    assert [text for text, _ in first] == [text for text, _ in second]
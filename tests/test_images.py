@@ -0,0 +1,150 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+
+from blog.images import generate_variants, variant_files
+from blog.models import ImageVariantFile, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.IMAGE_PROCESSING_WORKERS = 0
+    return tmp_path
+
+
+def _upload(size=(2000, 1000), color=(200, 30, 30)):
+    buffer = BytesIO()
+    Image.new("RGB", size, color=color).save(buffer, "JPEG")
+    return SimpleUploadedFile(
+        "photo.jpg", buffer.getvalue(), content_type="image/jpeg"
+    )
+
+
+def test_post_create_generates_variants(
+        media_root, user_client, published_category, published_location,
+        django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        user_client.post("/posts/create/", {
+            "title": "Фото",
+            "text": "Текст",
+            "pub_date": timezone.now().strftime("%Y-%m-%d %H:%M"),
+            "category": published_category.id,
+            "location": published_location.id,
+            "image": _upload(),
+        })
+    post = Post.objects.get()
+    variants = post.image_variants
+    assert set(variants) == {"card", "detail"}, (
+        "Убедитесь, что после сохранения публикации готовятся уменьшенные"
+        " копии фото."
+    )
+    assert (variants["card"]["width"], variants["card"]["height"]) == (
+        640, 320
+    )
+    for entry in variants.values():
+        for extension in ("jpg", "webp"):
+            assert (media_root / entry[extension]).exists()
+
+    content = user_client.get(f"/posts/{post.id}/").content.decode()
+    assert "srcset=" in content and "image/webp" in content, (
+        "Убедитесь, что на странице публикации фото выводится с `srcset`."
+    )
+
+
+def test_post_image_falls_back_to_original(
+        media_root, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    content = user_client.get(f"/posts/{post.id}/").content.decode()
+    assert post.image.url in content
+    assert "srcset=" not in content
+
+
+def test_replacing_image_resets_variants(
+        media_root, post_with_published_location
+):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(
+        image_variants={"card": {"width": 1}}
+    )
+    post = Post.objects.get(pk=post.pk)
+    post.title = "Новый заголовок"
+    post.save()
+    assert Post.objects.get(pk=post.pk).image_variants, (
+        "Сохранение публикации без смены фото не должно сбрасывать копии."
+    )
+    post.image = _upload()
+    post.save()
+    assert Post.objects.get(pk=post.pk).image_variants == {}
+
+
+def _with_variants(post, upload):
+    post.image = upload
+    post.save()
+    generate_variants(post.pk, post.image.name)
+    return Post.objects.get(pk=post.pk)
+
+
+def test_replacing_image_deletes_old_variants(
+        media_root, mixer, post_with_published_location,
+        django_capture_on_commit_callbacks
+):
+    post = _with_variants(post_with_published_location, _upload())
+    twin = _with_variants(
+        mixer.blend("blog.Post", category=post.category), _upload()
+    )
+    shared = variant_files(post.image_variants)
+    assert shared == variant_files(twin.image_variants)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        post = _with_variants(post, _upload(color=(30, 200, 30)))
+    assert all((media_root / name).exists() for name in shared), (
+        "Убедитесь, что копии, которые нужны другой публикации с тем же"
+        " фото, не удаляются."
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        _with_variants(twin, _upload(color=(30, 30, 200)))
+    assert not any((media_root / name).exists() for name in shared), (
+        "Убедитесь, что при замене фото старые копии удаляются."
+    )
+    assert all(
+        (media_root / name).exists()
+        for name in variant_files(post.image_variants)
+    )
+
+
+def test_variant_cleanup_does_not_scan_posts(
+        media_root, post_with_published_location,
+        django_capture_on_commit_callbacks
+):
+    post = _with_variants(post_with_published_location, _upload())
+    old = variant_files(post.image_variants)
+    with CaptureQueriesContext(connection) as context:
+        with django_capture_on_commit_callbacks(execute=True):
+            post = _with_variants(post, _upload(color=(30, 200, 30)))
+    assert not any(
+        "LIKE" in query["sql"] and "blog_post" in query["sql"]
+        for query in context.captured_queries
+    ), (
+        "Убедитесь, что при замене фото ссылки на копии не ищутся"
+        " просмотром всех публикаций."
+    )
+    assert not any((media_root / name).exists() for name in old)
+
+    new = variant_files(post.image_variants)
+    with django_capture_on_commit_callbacks(execute=True):
+        post.delete()
+    assert not any((media_root / name).exists() for name in new), (
+        "Убедитесь, что копии фото удалённой публикации удаляются."
+    )
+    assert not ImageVariantFile.objects.exists()
@@ -0,0 +1,63 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.http import Http404
+from django.test import RequestFactory
+
+from blogicum.media import serve_media
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def test_identical_uploads_share_one_file(media_root):
+    first = default_storage.save("posts_images/a.JPG", ContentFile(b"data"))
+    second = default_storage.save("posts_images/b.jpg", ContentFile(b"data"))
+    other = default_storage.save("posts_images/c.jpg", ContentFile(b"other"))
+    assert first == second, (
+        "Убедитесь, что одинаковые файлы сохраняются под одним именем."
+    )
+    assert first != other
+    assert first.startswith("posts_images/") and first.endswith(".jpg")
+    assert len(list((media_root / "posts_images").rglob("*.jpg"))) == 2
+
+
+def test_hashed_media_is_immutable(media_root):
+    name = default_storage.save("posts_images/a.jpg", ContentFile(b"data"))
+    request = RequestFactory().get(f"/media/{name}")
+    response = serve_media(request, name)
+    assert response.status_code == HTTPStatus.OK
+    assert b"".join(response.streaming_content) == b"data"
+    assert "immutable" in response["Cache-Control"]
+    assert "max-age=31536000" in response["Cache-Control"]
+
+    request = RequestFactory().get(
+        f"/media/{name}", HTTP_IF_NONE_MATCH=response["ETag"]
+    )
+    assert serve_media(request, name).status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_media_offload_headers(media_root, settings):
+    name = default_storage.save("posts_images/a.jpg", ContentFile(b"data"))
+    request = RequestFactory().get(f"/media/{name}")
+
+    settings.MEDIA_SENDFILE = "x-accel-redirect"
+    response = serve_media(request, name)
+    assert response["X-Accel-Redirect"] == f"/protected-media/{name}"
+    assert response.content == b""
+    assert response["Content-Type"] == "image/jpeg"
+
+    settings.MEDIA_SENDFILE = "x-sendfile"
+    response = serve_media(request, name)
+    assert response["X-Sendfile"] == str(media_root / name)
+
+
+def test_media_path_traversal_is_rejected(media_root):
+    request = RequestFactory().get("/media/../settings.py")
+    with pytest.raises(Http404):
+        serve_media(request, "../settings.py")
@@ -0,0 +1,105 @@
+import logging
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import AsyncClient
+
+from blogicum.metrics import registry
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def reset_registry():
+    registry.reset()
+
+
+def test_server_timing_header(admin_client, post_with_published_location):
+    response = admin_client.get("/")
+    header = response.get("Server-Timing", "")
+    for metric in ("db;dur=", "tpl;dur=", "total;dur="):
+        assert metric in header, (
+            "Убедитесь, что ответ содержит заголовок `Server-Timing` с"
+            f" метрикой `{metric.split(';')[0]}`."
+        )
+    assert 'queries"' in header
+
+
+def test_server_timing_is_hidden_from_visitors(
+        client, user_client, settings, post_with_published_location
+):
+    assert not settings.SERVER_TIMING
+    for visitor in (client, user_client):
+        assert "Server-Timing" not in visitor.get("/"), (
+            "Убедитесь, что заголовок `Server-Timing` по умолчанию не"
+            " отдаётся посетителям, кроме сотрудников."
+        )
+    settings.DEBUG = True
+    assert "Server-Timing" in client.get("/")
+    settings.DEBUG = False
+    settings.SERVER_TIMING = True
+    assert "Server-Timing" in client.get("/")
+
+
+def test_metrics_recorded_per_view(client, post_with_published_location):
+    client.get("/")
+    client.get(f"/category/{post_with_published_location.category.slug}/")
+    views = registry.snapshot()
+    assert views["blog:index"]["count"] == 1
+    assert views["blog:category_posts"]["queries"]["sum"] > 0, (
+        "Убедитесь, что SQL-запросы учитываются в метриках адреса."
+    )
+    assert views["blog:index"]["template_ms"]["sum"] > 0, (
+        "Убедитесь, что учитывается время отрисовки шаблонов."
+    )
+
+
+def test_slow_request_is_logged(
+        client, settings, caplog, post_with_published_location
+):
+    settings.SLOW_REQUEST_MS = 0
+    with caplog.at_level(logging.WARNING, logger="blogicum.metrics"):
+        client.get("/")
+    assert any("blog:index" in record.getMessage()
+               for record in caplog.records)
+    assert "SELECT" in caplog.text, (
+        "Убедитесь, что в журнал медленных запросов попадают самые долгие"
+        " SQL-запросы."
+    )
+
+
+def test_metrics_endpoint_is_staff_only(client, user_client, admin_client):
+    client.get("/")
+    assert client.get("/admin/metrics/").status_code == HTTPStatus.FOUND
+    assert user_client.get("/admin/metrics/").status_code == HTTPStatus.FOUND
+    response = admin_client.get("/admin/metrics/")
+    assert response.status_code == HTTPStatus.OK
+    assert "blog:index" in response.json()["views"]
+
+
+def test_async_server_timing_skips_sync_thread_for_visitors(
+        monkeypatch, admin_user, post_with_published_location
+):
+    from blogicum import metrics
+
+    calls = []
+
+    def spy(func):
+        calls.append(func)
+        return sync_to_async(func)
+
+    monkeypatch.setattr(metrics, "sync_to_async", spy)
+    client = AsyncClient()
+    response = async_to_sync(client.get)("/")
+    assert "Server-Timing" not in response
+    assert not calls, (
+        "Убедитесь, что для посетителя без сессии асинхронный запрос не"
+        " обращается к общему потоку синхронного кода."
+    )
+    client.force_login(admin_user)
+    response = async_to_sync(client.get)("/")
+    assert "Server-Timing" in response, (
+        "Убедитесь, что сотрудник видит заголовок `Server-Timing` и в"
+        " асинхронном режиме."
+    )
@@ -0,0 +1,222 @@
+from datetime import timedelta
+
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from test_queries import _count_queries
+
+pytestmark = [pytest.mark.django_db]
+
+FEED_URLS = (
+    "/",
+    "/category/{post.category.slug}/",
+    "/profile/{post.author.username}/",
+)
+
+
+@pytest.mark.parametrize("url_template", FEED_URLS)
+def test_anonymous_page_is_cached(
+        unlogged_client, post_with_published_location, url_template
+):
+    url = url_template.format(post=post_with_published_location)
+    first = unlogged_client.get(url).content
+    assert _count_queries(unlogged_client, url) == 0, (
+        f"Убедитесь, что страница `{url}` для анонимных посетителей"
+        " отдаётся из кэша."
+    )
+    assert unlogged_client.get(url).content == first
+
+
+@pytest.mark.parametrize("url_template", FEED_URLS)
+def test_page_cache_is_invalidated_by_comment(
+        mixer, unlogged_client, post_with_published_location, url_template
+):
+    post = post_with_published_location
+    url = url_template.format(post=post)
+    unlogged_client.get(url)
+    mixer.blend("blog.Comment", post=post)
+    assert _count_queries(unlogged_client, url) > 0
+
+
+def test_page_cache_is_invalidated_by_location(
+        unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    unlogged_client.get("/")
+    post.location.name = "Новое место"
+    post.location.save()
+    assert "Новое место" in unlogged_client.get("/").content.decode()
+
+
+def test_moving_post_invalidates_old_category(
+        unlogged_client, post_with_published_location, another_category
+):
+    post = post_with_published_location
+    url = f"/category/{post.category.slug}/"
+    assert post.title in unlogged_client.get(url).content.decode()
+    post.category = another_category
+    post.save()
+    assert post.title not in unlogged_client.get(url).content.decode()
+
+
+def test_page_cache_expires_with_scheduled_post(
+        mixer, user, unlogged_client, published_category
+):
+    from blog.caching import publication_aware_timeout
+
+    scheduled = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(seconds=30),
+    )
+    assert 0 < publication_aware_timeout(600) <= 30, (
+        "Убедитесь, что страница не кэшируется дольше, чем до публикации"
+        " отложенного поста."
+    )
+    assert scheduled.title not in unlogged_client.get("/").content.decode()
+
+
+def test_next_publication_time_is_cached_and_reset(
+        mixer, user, published_category, django_assert_num_queries
+):
+    from blog.caching import next_publication_time
+
+    assert next_publication_time() is None
+    with django_assert_num_queries(0):
+        assert next_publication_time() is None
+
+    pub_date = timezone.now() + timedelta(hours=1)
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=pub_date,
+    )
+    assert next_publication_time() == pub_date
+    with django_assert_num_queries(0):
+        assert next_publication_time() == pub_date
+
+
+def test_next_publication_time_moves_on_when_post_goes_live(
+        mixer, user, published_category, monkeypatch
+):
+    from blog import caching
+
+    now = timezone.now()
+    first, second = (now + timedelta(hours=1), now + timedelta(hours=2))
+    for pub_date in (first, second):
+        mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            pub_date=pub_date,
+        )
+    assert caching.next_publication_time() == first
+    monkeypatch.setattr(
+        caching.timezone, "now", lambda: first + timedelta(seconds=1)
+    )
+    assert caching.next_publication_time() == second
+
+
+def test_publication_after_unrelated_save_bumps_versions(
+        mixer, user, published_category, monkeypatch
+):
+    from blog import caching
+
+    now = timezone.now()
+    scheduled_at = now + timedelta(hours=1)
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=scheduled_at,
+    )
+    assert caching.next_publication_time() == scheduled_at
+    unrelated = mixer.blend(
+        "blog.Post", author=user, category=published_category
+    )
+    unrelated.title = "Правка до публикации"
+    unrelated.save()
+    versions = caching.get_versions(caching.ALL_SCOPE)
+    monkeypatch.setattr(
+        caching.timezone, "now", lambda: scheduled_at + timedelta(seconds=1)
+    )
+    assert caching.next_publication_time() is None
+    assert caching.get_versions(caching.ALL_SCOPE) != versions, (
+        "Убедитесь, что публикация отложенного поста сдвигает версии"
+        " страниц, даже если до неё сохраняли другой пост."
+    )
+
+
+def test_post_save_does_not_bump_all_pages(
+        mixer, user, published_category
+):
+    from blog import caching
+
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category
+    )
+    caching.next_publication_time()
+    versions = caching.get_versions(caching.ALL_SCOPE)
+    post.title = "Новый заголовок"
+    post.save()
+    caching.next_publication_time()
+    assert caching.get_versions(caching.ALL_SCOPE) == versions, (
+        "Убедитесь, что правка поста не сбрасывает кэш всех страниц."
+    )
+
+
+def test_read_traffic_keeps_page_versions(
+        mixer, user, published_category, client
+):
+    from blog import caching
+
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+    mixer.cycle(30).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    # Маленький общий кэш, который при переполнении очищается целиком.
+    small_cache = {
+        **settings.CACHES,
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "small",
+            "OPTIONS": {"MAX_ENTRIES": 5, "CULL_FREQUENCY": 0},
+        },
+    }
+    with override_settings(CACHES=small_cache):
+        caching.next_publication_time()
+        versions = caching.get_versions(caching.ALL_SCOPE)
+        for page in range(1, 4):
+            for _ in range(2):
+                assert client.get(f"/?page={page}").status_code == 200
+        assert caching.get_versions(caching.ALL_SCOPE) == versions, (
+            "Убедитесь, что вытеснение записей из кэша страниц не сбрасывает"
+            " версии всех страниц."
+        )
+
+
+def test_next_publication_lookup_uses_index(mixer, user, published_category):
+    from blog.caching import (
+        NEXT_PUBLICATION_KEY,
+        next_publication_time,
+        state_cache
+    )
+
+    mixer.blend("blog.Post", author=user, category=published_category)
+    state_cache.delete(NEXT_PUBLICATION_KEY)
+    with CaptureQueriesContext(connection) as context:
+        next_publication_time()
+    (query,) = [
+        query["sql"] for query in context.captured_queries
+        if "blog_post" in query["sql"]
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {query}")
+        plan = " ".join(str(row) for row in cursor.fetchall())
+    assert "post_published_pub_date_idx" in plan, (
+        "Убедитесь, что поиск ближайшей публикации идёт по индексу"
+        " post_published_pub_date_idx."
+    )
@@ -0,0 +1,74 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category, published_location):
+    now = timezone.now()
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+        pub_date=(now - timedelta(hours=hour) for hour in range(1, 100)),
+    )
+
+
+def _page_ids(response):
+    return [post.id for post in response.context["page_obj"]]
+
+
+@pytest.mark.parametrize(
+    "url_template",
+    [
+        "/",
+        "/category/{post.category.slug}/",
+        "/profile/{post.author.username}/",
+    ],
+    ids=["index", "category", "profile"],
+)
+def test_cursor_pages_match_offset_pages(client, feed_posts, url_template):
+    url = url_template.format(post=feed_posts[0])
+    first_page = client.get(url)
+    next_cursor = first_page.context["page_obj"].next_cursor
+    assert next_cursor, (
+        f"Убедитесь, что на странице `{url}` формируется курсор следующей"
+        " страницы."
+    )
+    second_page = client.get(url, {"cursor": next_cursor})
+    assert second_page.status_code == HTTPStatus.OK
+    assert _page_ids(second_page) == _page_ids(client.get(url, {"page": 2}))
+
+    third_page = client.get(
+        url, {"cursor": second_page.context["page_obj"].next_cursor}
+    )
+    assert _page_ids(third_page) == _page_ids(client.get(url, {"page": 3}))
+    assert not third_page.context["page_obj"].has_next()
+
+    previous_page = client.get(
+        url, {"cursor": third_page.context["page_obj"].previous_cursor}
+    )
+    assert _page_ids(previous_page) == _page_ids(second_page)
+
+
+def test_invalid_cursor_returns_404(client, feed_posts):
+    response = client.get("/", {"cursor": "not-a-cursor"})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_uncounted_paginator_skips_count(feed_posts, django_assert_num_queries):
+    from blog.models import Post
+    from blog.paginators import UncountedPaginator
+
+    paginator = UncountedPaginator(Post.published_posts.all(), N_PER_PAGE)
+    with django_assert_num_queries(1):
+        page = paginator.page(3)
+        assert len(page) == 5
+        assert page.has_previous() and not page.has_next()
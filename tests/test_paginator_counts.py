@@ -0,0 +1,134 @@
+import pytest
+from django.core.paginator import Paginator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    # Число постов берётся COUNT(*) или из таблицы счётчиков.
+    return sum(
+        "COUNT(" in query["sql"] or "postcounter" in query["sql"]
+        for query in context.captured_queries
+    )
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    return mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category
+    )
+
+
+@pytest.mark.parametrize(
+    "url_template",
+    [
+        "/",
+        "/category/{post.category.slug}/",
+        "/profile/{post.author.username}/",
+    ],
+    ids=["index", "category", "profile"],
+)
+def test_count_is_cached(another_user_client, posts, url_template):
+    url = url_template.format(post=posts[0])
+    assert _count_queries(another_user_client, url) == 1
+    assert _count_queries(another_user_client, url) == 0, (
+        f"Убедитесь, что число постов на странице `{url}` берётся из кэша."
+    )
+
+
+def test_count_is_invalidated_by_posts_only(
+        mixer, another_user_client, posts, published_category
+):
+    url = f"/category/{published_category.slug}/"
+    another_user_client.get(url)
+    mixer.blend("blog.Comment", post=posts[0])
+    assert _count_queries(another_user_client, url) == 0, (
+        "Убедитесь, что новый комментарий не сбрасывает кэш числа постов."
+    )
+    mixer.blend("blog.Post", category=published_category)
+    response = another_user_client.get(url)
+    assert response.context["paginator"].count == len(posts) + 1, (
+        "Убедитесь, что новый пост сбрасывает кэш числа постов."
+    )
+
+
+def test_owner_and_visitor_counts_differ(
+        mixer, user, user_client, another_user_client, posts
+):
+    mixer.blend("blog.Post", author=user, is_published=False)
+    url = f"/profile/{user.username}/"
+    assert another_user_client.get(url).context[
+        "paginator"
+    ].count == len(posts)
+    assert user_client.get(url).context["paginator"].count == len(posts) + 1, (
+        "Убедитесь, что автор и посетитель профиля не делят кэш числа"
+        " постов."
+    )
+
+
+@pytest.fixture
+def many_posts(mixer, published_category):
+    return mixer.cycle(150).blend("blog.Post", category=published_category)
+
+
+def test_elided_page_range(unlogged_client, many_posts):
+    response = unlogged_client.get("/?page=8")
+    page = response.context["page_obj"]
+    assert page.elided_page_range == [
+        1, 2, Paginator.ELLIPSIS, 5, 6, 7, 8, 9, 10, 11,
+        Paginator.ELLIPSIS, 14, 15
+    ], "Убедитесь, что длинный список страниц выводится с пропусками."
+    content = response.content.decode()
+    assert str(Paginator.ELLIPSIS) in content
+    assert 'href="?page=12"' not in content
+
+
+def test_estimated_count(
+        settings, monkeypatch, unlogged_client, many_posts
+):
+    settings.PAGINATOR_ESTIMATE_THRESHOLD = 100
+    monkeypatch.setattr("blog.paginators.estimate_count", lambda qs: 1000)
+    with CaptureQueriesContext(connection) as context:
+        response = unlogged_client.get("/?page=3")
+    assert not any(
+        "COUNT(" in query["sql"] for query in context.captured_queries
+    ), "Убедитесь, что для большой таблицы берётся оценка планировщика."
+    paginator = response.context["paginator"]
+    assert paginator.count_is_estimated and paginator.count == 1000
+    assert "Последняя" not in response.content.decode()
+    assert unlogged_client.get("/?page=15").status_code == 200
+    assert unlogged_client.get("/?page=16").status_code == 404, (
+        "Убедитесь, что страница за последним постом не найдена, даже"
+        " если число постов оценено с запасом."
+    )
+
+
+def test_count_without_cache_key_is_not_cached(rf, posts):
+    from django.views.generic import ListView
+
+    from blog.mixin import CachedCountMixin
+    from blog.models import Post
+
+    class PostListView(CachedCountMixin, ListView):
+        model = Post
+        paginate_by = 10
+        template_name = "blog/index.html"
+
+    def count_queries():
+        with CaptureQueriesContext(connection) as context:
+            response = PostListView.as_view()(rf.get("/"))
+        assert response.context_data["paginator"].count == len(posts)
+        return sum(
+            "COUNT(" in query["sql"] for query in context.captured_queries
+        )
+
+    assert count_queries() == 1
+    assert count_queries() == 1, (
+        "Убедитесь, что без ключа кэша число постов каждый раз считается"
+        " заново."
+    )
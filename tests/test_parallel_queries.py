@@ -0,0 +1,110 @@
+import threading
+import time
+
+import pytest
+from django.db import transaction
+
+from blog.models import Post
+from blogicum.db import run_in_parallel
+from conftest import BENCHMARK_STRICT
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+# Задержка каждого SQL-запроса в замере: имитирует удалённую базу.
+QUERY_DELAY = 0.1
+
+
+@pytest.fixture
+def parallel_queries(settings):
+    settings.PARALLEL_QUERIES = True
+
+
+@pytest.fixture
+def query_delay():
+    return QUERY_DELAY
+
+
+def _thread_name():
+    return threading.current_thread().name
+
+
+def test_results_keep_order(parallel_queries):
+    assert run_in_parallel(lambda: 1, lambda: 2, lambda: 3) == [1, 2, 3]
+
+
+def test_functions_run_in_pool(parallel_queries):
+    first, second = run_in_parallel(_thread_name, _thread_name)
+    assert first == threading.current_thread().name
+    assert second.startswith("parallel-queries"), (
+        "Убедитесь, что независимые запросы выполняются в пуле потоков."
+    )
+
+
+def test_errors_are_raised(parallel_queries):
+    def fail():
+        raise ValueError("ошибка")
+
+    with pytest.raises(ValueError):
+        run_in_parallel(lambda: 1, fail)
+
+
+def test_disabled_by_default():
+    names = run_in_parallel(_thread_name, _thread_name)
+    assert names == [threading.current_thread().name] * 2
+
+
+def test_sequential_inside_transaction(parallel_queries):
+    with transaction.atomic():
+        names = run_in_parallel(_thread_name, _thread_name)
+    assert names == [threading.current_thread().name] * 2, (
+        "Убедитесь, что внутри транзакции запросы выполняются в одном"
+        " соединении: другие соединения не видят её данных."
+    )
+
+
+@pytest.fixture
+def category_posts(mixer, published_category):
+    return mixer.cycle(25).blend("blog.Post", category=published_category)
+
+
+def test_parallel_pagination(
+        settings, monkeypatch, user_client, published_category,
+        category_posts, slow_db
+):
+    # Число постов иначе берётся из кэша, и запрос за ним не выполняется.
+    monkeypatch.setattr(
+        "blog.paginators.count_cache_key", lambda key, scopes: None
+    )
+    url = f"/category/{published_category.slug}/?page=2"
+    user_client.get(url)
+
+    started = time.perf_counter()
+    sequential = user_client.get(url)
+    sequential_elapsed = time.perf_counter() - started
+
+    settings.PARALLEL_QUERIES = True
+    # Поток пула открывает соединение при первом запросе, дальше оно
+    # переиспользуется.
+    user_client.get(url)
+    slow_db.reset()
+    started = time.perf_counter()
+    parallel = user_client.get(url)
+    parallel_elapsed = time.perf_counter() - started
+
+    assert parallel.status_code == 200
+    assert any(
+        name.startswith("parallel-queries") for name in slow_db.threads
+    ), (
+        "Убедитесь, что число постов и выборка страницы запрашиваются"
+        " в разных потоках."
+    )
+    assert (
+        parallel.context["page_obj"].object_list
+        == sequential.context["page_obj"].object_list
+    )
+    assert parallel.context["paginator"].count == Post.objects.count()
+    if BENCHMARK_STRICT:
+        assert parallel_elapsed < sequential_elapsed - QUERY_DELAY / 2, (
+            "Убедитесь, что число постов и выборка страницы запрашиваются"
+            " одновременно."
+        )
@@ -0,0 +1,148 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.counters import get_post_count
+from blog.models import (
+    AuthorPostCounter,
+    CategoryPostCounter,
+    LocationPostCounter,
+    Post,
+)
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _counts(post):
+    return (
+        get_post_count(CategoryPostCounter, post.category_id),
+        get_post_count(AuthorPostCounter, post.author_id),
+        get_post_count(LocationPostCounter, post.location_id),
+    )
+
+
+def _check_counters():
+    out = StringIO()
+    call_command("rebuild_post_counters", "--check", stdout=out)
+    return out.getvalue()
+
+
+def test_counters_follow_post_changes(
+        mixer, post_with_published_location, another_category
+):
+    post = post_with_published_location
+    assert _counts(post) == (1, 1, 1)
+    mixer.blend(
+        "blog.Post", category=post.category, author=post.author,
+        location=post.location
+    )
+    assert _counts(post) == (2, 2, 2)
+
+    post.is_published = False
+    post.save()
+    assert _counts(post) == (1, 1, 1), (
+        "Убедитесь, что снятый с публикации пост уходит из счётчиков."
+    )
+    post.is_published = True
+    post.category = another_category
+    post.save()
+    assert get_post_count(CategoryPostCounter, another_category.pk) == 1
+    assert _counts(post) == (1, 2, 2), (
+        "Убедитесь, что пост переносится между счётчиками категорий."
+    )
+    post.delete()
+    assert get_post_count(CategoryPostCounter, another_category.pk) == 0
+    assert "Неверных счётчиков: 0" in _check_counters()
+
+
+def test_concurrent_edits_keep_counters(post_with_published_location):
+    post = post_with_published_location
+    first = Post.objects.get(pk=post.pk)
+    second = Post.objects.get(pk=post.pk)
+    first.is_published = False
+    first.save()
+    second.title = "Правка из другой вкладки"
+    second.save()
+    assert Post.objects.get(pk=post.pk).is_published
+    assert _counts(post) == (1, 1, 1), (
+        "Убедитесь, что счётчики считаются от сохранённой строки поста,"
+        " а не от значений, прочитанных объектом."
+    )
+    assert "Неверных счётчиков: 0" in _check_counters()
+
+
+def test_scheduled_posts_are_not_counted(
+        mixer, monkeypatch, published_category
+):
+    now = timezone.now()
+    mixer.blend(
+        "blog.Post", category=published_category,
+        pub_date=now + timedelta(days=1)
+    )
+    assert get_post_count(CategoryPostCounter, published_category.pk) == 0
+    monkeypatch.setattr(timezone, "now", lambda: now + timedelta(days=2))
+    assert get_post_count(CategoryPostCounter, published_category.pk) == 1, (
+        "Убедитесь, что отложенный пост учитывается, когда наступает"
+        " время его публикации."
+    )
+
+
+def test_unpublished_category_hides_posts(post_with_published_location):
+    post = post_with_published_location
+    category = post.category
+    category.is_published = False
+    category.save()
+    assert _counts(post) == (0, 0, 0), (
+        "Убедитесь, что посты скрытой категории не учитываются счётчиками."
+    )
+    category.delete()
+    assert not AuthorPostCounter.objects.filter(
+        pk=post.author_id, count__gt=0
+    ).exists()
+    assert "Неверных счётчиков: 0" in _check_counters()
+
+
+def test_category_edit_does_not_recount(post_with_published_location):
+    category = post_with_published_location.category
+    category.title = "Новое название"
+    with CaptureQueriesContext(connection) as context:
+        category.save()
+    assert not any(
+        "postcounter" in query["sql"] for query in context.captured_queries
+    ), (
+        "Убедитесь, что правка категории без смены публикации не"
+        " пересчитывает счётчики постов."
+    )
+    category.delete()
+    assert _counts(post_with_published_location)[1:] == (0, 0), (
+        "Убедитесь, что удаление опубликованной категории пересчитывает"
+        " счётчики авторов и мест."
+    )
+    assert "Неверных счётчиков: 0" in _check_counters()
+
+
+def test_rebuild_command(post_with_published_location):
+    post = post_with_published_location
+    AuthorPostCounter.objects.all().delete()
+    LocationPostCounter.objects.update(count=5)
+    assert "Неверных счётчиков: 2" in _check_counters()
+    call_command("rebuild_post_counters", stdout=StringIO())
+    assert _counts(post) == (1, 1, 1)
+    assert "Неверных счётчиков: 0" in _check_counters()
+
+
+def test_category_page_reads_counter(
+        another_user_client, post_with_published_location
+):
+    url = f"/category/{post_with_published_location.category.slug}/"
+    with CaptureQueriesContext(connection) as context:
+        response = another_user_client.get(url)
+    assert response.context["paginator"].count == 1
+    assert not any(
+        "COUNT(" in query["sql"] for query in context.captured_queries
+    ), "Убедитесь, что число постов категории берётся из счётчика."
@@ -0,0 +1,154 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.caching import lookup_cache_key
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f"Убедитесь, что страница `{url}` отображается без ошибок."
+    )
+    return len(context.captured_queries)
+
+
+@pytest.mark.parametrize(
+    "url_template",
+    [
+        "/",
+        "/category/{post.category.slug}/",
+        "/profile/{post.author.username}/",
+    ],
+    ids=["index", "category", "profile"],
+)
+def test_feed_queries_do_not_depend_on_posts_count(
+        mixer, unlogged_client, published_location, published_category,
+        user, url_template
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location,
+    )
+    url = url_template.format(post=post)
+    one_post_queries = _count_queries(unlogged_client, url)
+    mixer.cycle(9).blend(
+        "blog.Post", author=user, category=published_category,
+        location=mixer.blend("blog.Location"),
+    )
+    assert _count_queries(unlogged_client, url) <= one_post_queries, (
+        f"Убедитесь, что число SQL-запросов на странице `{url}` не растёт"
+        " вместе с числом публикаций на ней."
+    )
+
+
+@pytest.mark.parametrize(
+    ("filter_by", "index_name"),
+    [
+        (None, "post_published_pub_date_idx"),
+        ("category", "post_category_pub_date_idx"),
+        ("author", "post_author_pub_date_idx"),
+    ],
+    ids=["index", "category", "profile"],
+)
+def test_feed_query_uses_index(
+        mixer, user, published_category, filter_by, index_name
+):
+    from blog.models import Post
+
+    mixer.cycle(5).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    queryset = Post.published_posts.all()
+    if filter_by == "category":
+        queryset = queryset.filter(category=published_category)
+    elif filter_by == "author":
+        queryset = queryset.filter(author=user)
+    assert index_name in queryset.explain(), (
+        f"Убедитесь, что запрос ленты использует индекс `{index_name}`."
+    )
+
+
+def test_post_detail_queries_do_not_depend_on_comments_count(
+        mixer, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    mixer.blend("blog.Comment", post=post)
+    one_comment_queries = _count_queries(user_client, url)
+    mixer.cycle(10).blend("blog.Comment", post=post)
+    assert _count_queries(user_client, url) <= one_comment_queries, (
+        "Убедитесь, что число SQL-запросов на странице публикации не растёт"
+        " вместе с числом комментариев."
+    )
+
+
+def test_category_and_profile_lookups_are_cached(
+        another_user_client, post_with_published_location
+):
+    post = post_with_published_location
+    # Прогревает общий для всех страниц кэш ближайшей публикации.
+    another_user_client.get("/")
+    for url in (
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    ):
+        first_queries = _count_queries(another_user_client, url)
+        # Повторный запрос берёт из кэша объект страницы и число постов.
+        assert _count_queries(another_user_client, url) == first_queries - 2, (
+            f"Убедитесь, что объект страницы `{url}` берётся из кэша."
+        )
+
+
+def test_category_lookup_cache_is_invalidated_on_save(
+        unlogged_client, post_with_published_location
+):
+    category = post_with_published_location.category
+    url = f"/category/{category.slug}/"
+    _count_queries(unlogged_client, url)
+    category.is_published = False
+    category.save()
+    assert unlogged_client.get(url).status_code == 404
+
+
+def test_lookup_cache_is_invalidated_on_rename(
+        unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    category, author = post.category, post.author
+    old_urls = (
+        f"/category/{category.slug}/", f"/profile/{author.username}/"
+    )
+    for url in old_urls:
+        _count_queries(unlogged_client, url)
+    category.slug = f"{category.slug}-new"
+    category.save()
+    author.username = f"{author.username}-new"
+    author.save()
+    for url in old_urls:
+        assert unlogged_client.get(url).status_code == 404, (
+            f"Убедитесь, что после переименования страница `{url}` по"
+            " прежнему адресу не берётся из кэша."
+        )
+    assert unlogged_client.get(
+        f"/category/{category.slug}/"
+    ).status_code == 200
+    assert unlogged_client.get(
+        f"/profile/{author.username}/"
+    ).status_code == 200
+
+
+def test_cached_user_has_no_password(
+        unlogged_client, post_with_published_location
+):
+    author = post_with_published_location.author
+    _count_queries(unlogged_client, f"/profile/{author.username}/")
+    cached = cache.get(lookup_cache_key(type(author), author.username))
+    assert cached == author
+    assert "password" not in vars(cached), (
+        "Убедитесь, что хеш пароля пользователя не попадает в общий кэш."
+    )
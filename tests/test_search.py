@@ -0,0 +1,139 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category, published_location):
+    def make(title, text="Текст", **kwargs):
+        fields = {
+            "author": user,
+            "category": published_category,
+            "location": published_location,
+            "pub_date": timezone.now(),
+            **kwargs,
+        }
+        post = Post(title=title, text=text, **fields)
+        post.save()
+        return post
+    return make
+
+
+def _found(client, query, **params):
+    response = client.get("/search/", {"q": query, **params})
+    assert response.status_code == HTTPStatus.OK
+    return [post.id for post in response.context["page_obj"]]
+
+
+def test_search_ranks_title_above_text_and_comments(client, user, make_post):
+    in_text = make_post("Путевые заметки", "Были на выставке кораблей")
+    in_title = make_post("Выставка кораблей", "Заметки")
+    in_comment = make_post("Другое", "Совсем другое")
+    Comment.objects.create(
+        post=in_comment, author=user, text="А я был на выставке"
+    )
+    make_post("Не про то", "Ничего общего")
+    assert _found(client, "выстав") == [in_title.id, in_text.id,
+                                        in_comment.id], (
+        "Убедитесь, что поиск находит посты по заголовку, тексту и"
+        " комментариям и ставит совпадения в заголовке выше."
+    )
+
+
+def test_search_respects_visibility(client, mixer, make_post):
+    make_post("Скрытый котик", is_published=False)
+    make_post("Будущий котик", pub_date=timezone.now() + timedelta(days=1))
+    make_post(
+        "Котик в скрытой категории",
+        category=mixer.blend("blog.Category", is_published=False),
+    )
+    visible = make_post("Видимый котик")
+    assert _found(client, "котик") == [visible.id], (
+        "Убедитесь, что поиск показывает только опубликованные посты,"
+        " как и лента."
+    )
+
+
+def test_search_skips_hidden_comments(client, user, make_post):
+    post = make_post("Заметка", "Текст")
+    comment = Comment.objects.create(
+        post=post, author=user, text="Бегемот", is_published=False
+    )
+    assert _found(client, "бегемот") == [], (
+        "Убедитесь, что поиск не находит посты по скрытым комментариям."
+    )
+    comment.is_published = True
+    comment.save()
+    assert _found(client, "бегемот") == [post.id]
+
+
+def test_postgres_search_query(monkeypatch, client, make_post):
+    pytest.importorskip("psycopg2")
+    from django.db.backends.postgresql.base import DatabaseWrapper
+
+    from blog import search
+
+    calls = []
+    monkeypatch.setattr(search, "uses_fts5", lambda: False)
+    monkeypatch.setattr(
+        search, "search_postgres",
+        lambda queryset, raw_query: calls.append(raw_query) or queryset.none()
+    )
+    assert _found(client, "Кот  ПЁС") == []
+    assert calls == ["кот:* & пёс:*"], (
+        "Убедитесь, что в PostgreSQL поиск идёт через search_postgres"
+        " по всем словам запроса с префиксами."
+    )
+    monkeypatch.undo()
+
+    queryset = search.search_postgres(Post.published_posts.all(), "кот:*")
+    postgres = DatabaseWrapper({
+        **connection.settings_dict,
+        "ENGINE": "django.db.backends.postgresql",
+    })
+    sql, _ = queryset.query.get_compiler(connection=postgres).as_sql()
+    comments = sql[sql.index('FROM "blog_comment"'):sql.index("LIMIT 1")]
+    assert '."is_published"' in comments, (
+        "Убедитесь, что в PostgreSQL поиск не находит посты по скрытым"
+        " комментариям."
+    )
+    assert "to_tsquery" in sql and "ts_rank" in sql
+
+
+def test_search_index_follows_changes(client, user, make_post):
+    post = make_post("Старый заголовок")
+    post.title = "Новый заголовок"
+    post.save()
+    assert _found(client, "новый") == [post.id]
+    assert _found(client, "старый") == []
+
+    comment = Comment.objects.create(post=post, author=user, text="Бегемот")
+    assert _found(client, "бегемот") == [post.id]
+    comment.delete()
+    assert _found(client, "бегемот") == []
+    post.delete()
+    assert _found(client, "новый") == []
+
+
+def test_search_pagination_keeps_query(client, make_post):
+    for i in range(12):
+        make_post(f"Заметка {i}")
+    response = client.get("/search/", {"q": "заметка"})
+    assert len(response.context["page_obj"]) == 10
+    assert "q=%D0%B7%D0%B0%D0%BC%D0%B5%D1%82%D0%BA%D0%B0&amp;page=2" in (
+        response.content.decode()
+    )
+    assert len(_found(client, "заметка", page=2)) == 2
+
+
+def test_empty_search(client, make_post):
+    make_post("Заголовок")
+    assert _found(client, "") == []
+    assert _found(client, "!!!") == []
@@ -0,0 +1,118 @@
+from http import HTTPStatus
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from PIL import Image
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.fixture
+def post_data(published_category, published_location):
+    return {
+        "title": "Фото",
+        "text": "Текст",
+        "pub_date": timezone.now().strftime("%Y-%m-%d %H:%M"),
+        "category": published_category.id,
+        "location": published_location.id,
+    }
+
+
+def _upload(size=(300, 200), exif=None):
+    buffer = BytesIO()
+    image = Image.new("RGB", size, color=(10, 120, 200))
+    image.save(buffer, "JPEG", **({"exif": exif} if exif else {}))
+    return SimpleUploadedFile(
+        "photo.jpg", buffer.getvalue(), content_type="image/jpeg"
+    )
+
+
+def test_oversize_upload_is_rejected(
+        media_root, settings, user_client, post_data
+):
+    settings.MAX_IMAGE_UPLOAD_SIZE = 1024
+    response = user_client.post(
+        "/posts/create/", {**post_data, "image": _upload((800, 800))}
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert "image" in response.context["form"].errors, (
+        "Убедитесь, что слишком большой файл отклоняется с ошибкой в поле"
+        " `image`."
+    )
+    assert not Post.objects.exists()
+
+
+def test_oversize_request_is_rejected_from_headers(
+        media_root, settings, user_client, post_data
+):
+    settings.MAX_IMAGE_UPLOAD_SIZE = 1024
+    settings.DATA_UPLOAD_MAX_MEMORY_SIZE = 1024
+    response = user_client.post(
+        "/posts/create/", {**post_data, "image": _upload((800, 800))}
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert not Post.objects.exists()
+
+
+def test_image_dimensions_are_limited(
+        media_root, settings, user_client, post_data
+):
+    settings.MAX_IMAGE_SIDE = 250
+    response = user_client.post(
+        "/posts/create/", {**post_data, "image": _upload((300, 200))}
+    )
+    assert "image" in response.context["form"].errors, (
+        "Убедитесь, что фото с размерами больше допустимых отклоняется."
+    )
+    assert not Post.objects.exists()
+
+
+def test_exif_is_applied_and_stripped(media_root, user_client, post_data):
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: повернуть на 90° по часовой стрелке.
+    exif[0x010F] = "Camera"
+    user_client.post(
+        "/posts/create/", {**post_data, "image": _upload(exif=exif)}
+    )
+    post = Post.objects.get()
+    with Image.open(post.image.path) as image:
+        assert image.size == (200, 300), (
+            "Убедитесь, что фото поворачивается согласно EXIF."
+        )
+        assert not image.getexif(), (
+            "Убедитесь, что метаданные EXIF удаляются из загруженного фото."
+        )
+
+
+def test_exif_without_rotation_is_stripped_without_reencoding():
+    from blog.images import normalize_orientation
+
+    exif = Image.Exif()
+    exif[0x0112] = 1
+    exif[0x010F] = "Camera"
+    upload = _upload(exif=exif)
+    original = upload.read()
+    result = normalize_orientation(upload)
+    assert not isinstance(result.file, BytesIO), (
+        "Убедитесь, что обработанное фото пишется во временный файл,"
+        " а не в память."
+    )
+    stripped = result.read()
+    assert result.size == len(stripped)
+    scan = original.index(b"\xff\xda")
+    assert stripped.endswith(original[scan:]), (
+        "Убедитесь, что фото без поворота не сжимается заново."
+    )
+    with Image.open(BytesIO(stripped)) as image:
+        assert not image.getexif()
+        image.load()